@@ -2,7 +2,10 @@ import base64
 
 from ..utils import ConfigNamespace, Logger, FileInfo, FileValidator
 
-from .base import Base64Decoder, Base64Encoder
+from .base import (  # pylint: disable=redefined-builtin
+    Base64Decoder, Base64Encoder, CodecReader, CodecSession, CodecWriter,
+    FrameError, TextCodec, VerifyResult, codec_names, decode_range,
+    get_codec, open, register_codec, verify)
 from .decoding import Base64FileDecoder
 from .encoding import Base64FileEncoder
 
@@ -12,4 +15,16 @@ __all__ = [
     "Base64FileDecoder",
     "Base64Encoder",
     "Base64Decoder",
+    "CodecReader",
+    "CodecSession",
+    "CodecWriter",
+    "FrameError",
+    "TextCodec",
+    "VerifyResult",
+    "codec_names",
+    "decode_range",
+    "get_codec",
+    "open",
+    "register_codec",
+    "verify",
 ]
@@ -1,25 +1,42 @@
-import base64
 from dataclasses import dataclass
 
-from amy.utils import Logger, FileInfo, FileValidator, ConfigNamespace
+from amy.utils import (
+    Logger, FileInfo, FileValidator, ConfigNamespace, MetricsWriter,
+    StageProfiler)
+
+from .container import FrameError
+from .ranges import decode_range
+from .registry import (
+    CODECS, TextCodec, codec_names, get_codec, register_codec)
+from .session import CodecSession
+from .verify import VerifyResult, verify
+from .wrappers import (  # pylint: disable=redefined-builtin
+    CodecReader, CodecWriter, open)
 
 
 class Codec:
-    """Base class for all encoders."""
+    """
+    Base class for all encoders.
+
+    The encoding is looked up in the codec registry by ``codec_name``, so
+    a subclass selects another registered codec by overriding it.
+    """
+
+    codec_name: str = "base64"
 
-    @staticmethod
-    def encode(data: bytes) -> bytes:
+    @classmethod
+    def encode(cls, data: bytes) -> bytes:
         """Encode the given data."""
         try:
-            return base64.b64encode(data)
+            return get_codec(cls.codec_name).encode(data)
         except Exception as e:
             raise ValueError("Encoding failed") from e
 
-    @staticmethod
-    def decode(data: bytes) -> bytes:
+    @classmethod
+    def decode(cls, data: bytes) -> bytes:
         """Decode the given data."""
         try:
-            return base64.b64decode(data)
+            return get_codec(cls.codec_name).decode(data)
         except Exception as e:
             raise ValueError("Decoding failed") from e
 
@@ -45,117 +62,142 @@ class Base64Encoder(Codec):
 
 
 class FileCodec:
-    """Base class for all file encoders."""
+    """
+    Base class for all file encoders.
 
-    _instances = {}
-    environment: ConfigNamespace = None
+    A thin wrapper around a CodecSession: every instance owns its session,
+    so separate encoder and decoder instances never share paths or options.
+    """
 
-    file: FileInfo = None
     logger: Logger = Logger()
-    mode: str = None
+    session: CodecSession = None
+    metrics: MetricsWriter = None
+    quiet: bool = False
+    _profiler: StageProfiler = None
 
-    def __new__(cls):
-        instance = cls._instances.setdefault(cls, super().__new__(cls))
-        instance.__init__()
-        return instance
-
-    @classmethod
-    def set_environment(cls, environment: ConfigNamespace) -> None:
+    def set_environment(self, environment: ConfigNamespace) -> None:
         """Sets the environment variables."""
-        cls.environment = environment
-        cls.startup()
+        self.session = CodecSession(environment, profiler=self.profiler)
+
+        metrics_path = getattr(environment, "metrics", None)
+        self.metrics = MetricsWriter(metrics_path) if metrics_path else None
+        self.quiet = bool(getattr(environment, "quiet", False))
+
+    @property
+    def profiler(self) -> StageProfiler:
+        """
+        Returns the stage profiler of this instance.
+
+        Subscribe to it to receive ``(stage, seconds, nbytes)`` for the
+        read, transform, write, hash, total and summary stages of each job.
+        """
+        if self._profiler is None:
+            self._profiler = StageProfiler()
+        return self._profiler
+
+    @property
+    def environment(self) -> ConfigNamespace:
+        """Returns the environment of the current session."""
+        return self.session.environment if self.session else None
+
+    @property
+    def file(self) -> FileInfo:
+        """Returns the file information of the current session."""
+        return self.session.file if self.session else None
+
+    @property
+    def mode(self) -> str:
+        """Returns the mode of the current session."""
+        return self.session.mode if self.session else None
+
+    def decode(self) -> bool:
+        """
+        Main method to decode the Base64 file.
+
+        Returns False if decoding failed; the error has been logged.
+        """
+
+        if not self.file:
+            raise ValueError("File paths are not set.")
 
-    @classmethod
-    def startup(cls) -> None:
-        """Initializes the codec environment."""
+        try:
+            # Perform decoding
+            self.session.process(encoding=False)
 
-        if not cls.environment:
-            raise ValueError("Environment variables are not set.")
+            self.report(mode="decoded")
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.error(f"Error: {err}", stacklevel=2)
+            return False
+        return True
 
-        cls.mode = cls.environment.mode
+    def encode(self) -> bool:
+        """
+        Main method to encode the file to Base64.
 
-        input_file = cls.environment.file
-        output_file = cls.environment.file
+        Returns False if encoding failed; the error has been logged.
+        """
+        if not self.file:
+            raise ValueError("File paths are not set.")
 
-        output_file = output_file if output_file else cls._get_file_path(
-            file=input_file, mode=cls.mode)
+        try:
+            # Perform encoding
+            self.session.process(encoding=True)
 
-        FileValidator.validate_file(input_file)
-        FileValidator.validate_file(output_file)
+            # Log success
+            self.report(mode="encoded")
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.error(f"Error: {err}")
+            return False
+        return True
 
-        cls.file = FileInfo(
-            input_path=input_file,
-            output_path=output_file
-        )
+    def report(self, mode: str) -> None:
+        """
+        Emits the metrics of the processed file and logs its summary.
 
-    @classmethod
-    def _get_file_path(cls, file: str, mode=""):
-        """tbe"""
+        The Rich summary is skipped entirely when the environment is quiet.
+        """
+        if self.metrics:
+            self.metrics.emit(self.session.metrics())
 
-        if mode != "b64":
-            return f"{file}.b64"
+        if self.quiet:
+            return
 
-        if file.endswith('.b64'):
-            return file[:-4]
+        if self.session.skipped:
+            self.logger.info(
+                f"File '{self.file.output_path}' is up to date, skipped")
+            return
 
-        raise NotImplementedError(
-            f"Mode {mode} not supported.")
+        with self.profiler.measure("summary"):
+            self.logger.log_summary(file=self.file, mode=mode)
 
-    @classmethod
-    def decode(cls) -> None:
-        """Main method to decode the Base64 file."""
+    def process(self, encoding: bool) -> FileInfo:
+        """
+        Transforms the file without logging, raising on failure.
 
-        if not cls.file:
+        Returns the FileInfo with the recorded sizes and digests.
+        """
+        if not self.session:
             raise ValueError("File paths are not set.")
 
-        try:
-            # Perform decoding
-            data = cls._read_file(cls.file.input_path)
-            original_data = Base64Decoder.decode(data)
-            cls._write_file(cls.file.output_path, original_data)
-
-            cls.logger.log_summary(file=cls.file, mode="decoded")
-        except Exception as err:  # pylint: disable=broad-except
-            cls.logger.error(f"Error: {err}", stacklevel=2)
-
-    @classmethod
-    def encode(cls) -> None:
-        """Main method to encode the file to Base64."""
-        try:
-            # Perform encoding
-            file_data = cls._read_file(cls.file.input_path)
-            b64_data = Base64Encoder.encode(file_data)
-            cls._write_file(cls.file.output_path, b64_data)
-
-            # Log success
-            cls.logger.log_summary(file=cls.file, mode="encoded")
-        except Exception as err:  # pylint: disable=broad-except
-            cls.logger.error(f"Error: {err}")
-
-    @staticmethod
-    def _read_file(file_path: str) -> bytes:
-        """Reads content from the specified file."""
-        try:
-            with open(file_path, 'rb') as file:
-                return file.read()
-        except OSError as err:
-            raise ValueError(
-                f"Failed to read file '{file_path}': {err}") from err
-
-    @staticmethod
-    def _write_file(file_path: str, data: bytes) -> None:
-        """Writes data to the specified file."""
-        try:
-            with open(file_path, 'wb') as file:
-                file.write(data)
-        except OSError as err:
-            raise ValueError(
-                f"Failed to write to file '{file_path}': {err}") from err
+        return self.session.process(encoding=encoding)
 
 
 __all__ = [
+    "CODECS",
     "Codec",
+    "CodecReader",
+    "CodecSession",
+    "CodecWriter",
     "FileCodec",
+    "FrameError",
     "Base64Decoder",
     "Base64Encoder",
+    "TextCodec",
+    "VerifyResult",
+    "codec_names",
+    "decode_range",
+    "get_codec",
+    "open",
+    "register_codec",
+    "verify",
 ]
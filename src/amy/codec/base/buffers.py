@@ -0,0 +1,65 @@
+import threading
+from typing import Dict, List
+
+# Buffers kept per size; enough for one reader, one transform and one
+# writer stage to each hold a buffer while another waits in a queue.
+DEFAULT_POOL_CAPACITY = 4
+
+
+class BufferPool:
+    """
+    Recycles fixed-size bytearrays between chunks.
+
+    Buffers are handed out by size and returned after use, so a warm loop
+    reuses the same memory instead of allocating a new object per chunk.
+    ``misses`` counts the buffers the pool had to create because none of
+    the requested size was free.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_POOL_CAPACITY):
+        self.capacity = capacity
+        self.misses = 0
+        self._free: Dict[int, List[bytearray]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, size: int) -> bytearray:
+        """Returns a free buffer of the given size, allocating if needed."""
+        with self._lock:
+            free = self._free.get(size)
+            if free:
+                return free.pop()
+            self.misses += 1
+        return bytearray(size)
+
+    def reserve(self, capacity: int) -> None:
+        """Raises the number of buffers kept per size to at least capacity."""
+        with self._lock:
+            self.capacity = max(self.capacity, capacity)
+
+    def release(self, buffer: bytearray) -> None:
+        """Returns a buffer to the pool, dropping it if the pool is full."""
+        with self._lock:
+            free = self._free.setdefault(len(buffer), [])
+            if len(free) < self.capacity:
+                free.append(buffer)
+
+    def clear(self) -> None:
+        """Drops all free buffers."""
+        with self._lock:
+            self._free.clear()
+
+    def __str__(self) -> str:
+        return "BufferPool"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# Shared by all streams in a process, so consecutive files reuse buffers.
+default_pool = BufferPool()
+
+
+__all__ = [
+    "BufferPool",
+    "default_pool",
+]
@@ -0,0 +1,551 @@
+import binascii
+import hashlib
+import importlib
+import os
+import zlib
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, BinaryIO, Callable, Optional, Tuple
+
+from .buffers import BufferPool, default_pool
+from .parallel import (
+    DEFAULT_SEGMENT_SIZE, plan_segments, resolve_jobs, _run_tasks)
+from .registry import BASE64, CODECS, TextCodec, get_codec
+from .stream import (
+    ENCODE_BLOCK, StreamStats, align_chunk_size, _digest, _hexdigest)
+
+# First bytes of every container; the space cannot start a Base64 group.
+MAGIC = b"AMY64 "
+CONTAINER_VERSION = 1
+
+# Original bytes per frame: 768 KiB encode to exactly 1 MiB of Base64.
+DEFAULT_FRAME_SIZE = 3 * 256 * 1024
+
+# Header lines longer than this are rejected before parsing.
+MAX_HEADER_SIZE = 4096
+
+# Standard library codecs the frames can be compressed with.
+COMPRESSIONS = ("none", "zlib", "bz2", "lzma")
+
+_SIZE_WIDTH = 20
+_EMPTY_DIGEST = "0" * 64
+
+
+class FrameError(ValueError):
+    """A frame of a container is malformed or fails its checksum."""
+
+    def __init__(self, message: str, frame: int = None, offset: int = None):
+        super().__init__(message)
+        self.frame = frame
+        self.offset = offset
+
+    def __reduce__(self):
+        # Keeps the frame details when raised in a worker process.
+        return self.__class__, (str(self), self.frame, self.offset)
+
+
+@dataclass
+class ContainerHeader:
+    """
+    The header line of a framed container.
+
+    A container is a line of ``key=value`` fields after the magic,
+    followed by one line per frame of ``frame_size`` original bytes::
+
+        AMY64 version=1 codec=base64 compression=none frame=786432 ...
+        <index:08x> <crc32:08x> <Base64 of the frame>
+
+    Frames are encoded with the registered codec the header names. With a
+    compression other than "none", every frame is compressed on
+    its own before it is encoded, so frames still decode independently.
+    The CRC32 is taken over the original bytes of the frame. Size and
+    digest have a fixed width, so they are filled in once the input is
+    consumed without moving the frames.
+    """
+    size: int = 0
+    frame_size: int = DEFAULT_FRAME_SIZE
+    sha256: str = _EMPTY_DIGEST
+    codec: str = "base64"
+    compression: str = "none"
+    version: int = CONTAINER_VERSION
+
+    def to_bytes(self) -> bytes:
+        """Serializes the header line, including its line break."""
+        return (f"{MAGIC.decode()}version={self.version} codec={self.codec} "
+                f"compression={self.compression} frame={self.frame_size} "
+                f"size={self.size:0{_SIZE_WIDTH}d} "
+                f"sha256={self.sha256}\n").encode()
+
+    @classmethod
+    def parse(cls, line: bytes) -> "ContainerHeader":
+        """
+        Parses a header line.
+
+        Raises:
+            FrameError: If the line is not a supported container header.
+        """
+        if not line.startswith(MAGIC) or not line.endswith(b"\n"):
+            raise FrameError("Not a container header")
+        try:
+            fields = dict(item.split("=", 1)
+                          for item in line[len(MAGIC):].decode().split())
+            header = cls(size=int(fields["size"]),
+                         frame_size=int(fields["frame"]),
+                         sha256=fields["sha256"],
+                         codec=fields["codec"],
+                         compression=fields.get("compression", "none"),
+                         version=int(fields["version"]))
+        except (KeyError, ValueError, UnicodeDecodeError) as err:
+            raise FrameError(f"Malformed container header: {err}") from err
+
+        if header.version != CONTAINER_VERSION:
+            raise FrameError(
+                f"Container version {header.version} not supported")
+        if header.codec not in CODECS:
+            raise FrameError(f"Container codec {header.codec} not supported")
+        if header.compression not in COMPRESSIONS:
+            raise FrameError(
+                f"Container compression {header.compression} not supported")
+        if header.frame_size <= 0 or header.frame_size % ENCODE_BLOCK:
+            raise FrameError(f"Invalid frame size {header.frame_size}")
+        return header
+
+    @property
+    def frames(self) -> int:
+        """Returns the number of frames the original data is split into."""
+        return -(-self.size // self.frame_size)
+
+    @property
+    def max_line(self) -> int:
+        """Returns the length of the longest possible frame line."""
+        payload = self.frame_size
+        if self.compression != "none":
+            # Incompressible data grows by well under 1/64 with every codec.
+            payload += self.frame_size // 64 + 1024
+        return 18 + get_codec(self.codec).encoded_size(payload) + 1
+
+
+def _compressor(compression: str) -> Optional[Callable[[Any], bytes]]:
+    """
+    Returns the function compressing one frame, None for "none".
+
+    Raises:
+        ValueError: If the compression is not supported.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compression {compression} not supported, "
+                         f"expected one of {', '.join(COMPRESSIONS)}")
+    if compression == "none":
+        return None
+    # bz2 and lzma are only imported once a container uses them.
+    return importlib.import_module(compression).compress
+
+
+def _decompress(compression: str, payload: bytes, limit: int) -> bytes:
+    """
+    Decompresses one frame, producing at most ``limit + 1`` bytes.
+
+    Raises:
+        ValueError: If the payload is corrupt, truncated or followed by
+            other data.
+    """
+    module = importlib.import_module(compression)
+    if compression == "zlib":
+        decompressor = module.decompressobj()
+    elif compression == "bz2":
+        decompressor = module.BZ2Decompressor()
+    else:
+        decompressor = module.LZMADecompressor()
+
+    errors = (zlib.error, OSError, EOFError, ValueError,
+              getattr(module, "LZMAError", ValueError))
+    try:
+        data = decompressor.decompress(payload, limit + 1)
+    except errors as err:
+        raise ValueError(f"{compression} data is corrupt: {err}") from err
+    if not decompressor.eof or decompressor.unused_data:
+        raise ValueError(f"{compression} data is truncated or too long")
+    return data
+
+
+def is_container(path: str) -> bool:
+    """Returns True if the file starts with the container magic."""
+    try:
+        with open(path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_header(source: BinaryIO) -> Tuple[ContainerHeader, bytes]:
+    """Reads the header line, returning it parsed and as read."""
+    line = source.readline(MAX_HEADER_SIZE)
+    return ContainerHeader.parse(line), line
+
+
+def _frame_line(index: int, data: Any, payload: Any = None,
+                codec: TextCodec = BASE64) -> bytes:
+    """
+    Builds the line of one frame from its original bytes and, when it is
+    compressed, the payload they were compressed to.
+    """
+    payload = data if payload is None else payload
+    return b"%08x %08x %s\n" % (index, zlib.crc32(data),
+                                 codec.encode(payload))
+
+
+def _decode_frame(line: bytes, expected: int, header: ContainerHeader,
+                  offset: int) -> Tuple[bytes, int]:
+    """
+    Decodes, decompresses and verifies one frame line.
+
+    Args:
+        line (bytes): The frame line, including its line break.
+        expected (int): The index the frame must have.
+        header (ContainerHeader): The container header.
+        offset (int): The byte offset of the line, for error messages.
+
+    Returns:
+        Tuple[bytes, int]: The original bytes and the size of the payload
+            they were stored as.
+
+    Raises:
+        FrameError: If the line is malformed, out of order or corrupt.
+    """
+    if len(line) < 19 or line[8:9] != b" " or line[17:18] != b" " or \
+            not line.endswith(b"\n"):
+        raise FrameError(
+            f"Frame {expected} at byte {offset} is malformed",
+            frame=expected, offset=offset)
+    try:
+        index = int(line[:8], 16)
+        crc = int(line[9:17], 16)
+        payload = get_codec(header.codec).decode(line[18:-1])
+    except (ValueError, binascii.Error) as err:
+        raise FrameError(
+            f"Frame {expected} at byte {offset} is malformed: {err}",
+            frame=expected, offset=offset) from err
+
+    if index != expected:
+        raise FrameError(
+            f"Frame {expected} at byte {offset} is missing, found frame "
+            f"{index}", frame=expected, offset=offset)
+
+    length = min(header.frame_size, header.size - index * header.frame_size)
+    data = payload
+    if header.compression != "none":
+        try:
+            data = _decompress(header.compression, payload, length)
+        except ValueError as err:
+            raise FrameError(
+                f"Frame {index} at byte {offset} failed to decompress: "
+                f"{err}", frame=index, offset=offset) from err
+
+    if len(data) != length or zlib.crc32(data) != crc:
+        raise FrameError(
+            f"Frame {index} at byte {offset} failed its CRC32 check "
+            f"(original bytes {index * header.frame_size}-"
+            f"{index * header.frame_size + length})",
+            frame=index, offset=offset)
+    return data, len(payload)
+
+
+def _read_frame(source: BinaryIO, view: memoryview) -> int:
+    """Fills the view from the source, returning fewer bytes only at EOF."""
+    filled = 0
+    while filled < len(view):
+        count = source.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def container_encode(source: BinaryIO, target: BinaryIO,
+                     frame_size: int = DEFAULT_FRAME_SIZE,
+                     source_hash: Any = None,
+                     pool: BufferPool = None,
+                     compression: str = "none",
+                     codec: str = "base64") -> StreamStats:
+    """
+    Encodes the source stream into a framed container.
+
+    Every ``frame_size`` bytes of input become one line holding the frame
+    index, the CRC32 of the original bytes and their encoding with
+    ``codec``, compressed first unless ``compression`` is "none". The header's size
+    and SHA-256 are written last, so the target must be seekable.
+
+    Args:
+        source (BinaryIO): The binary stream to read from.
+        target (BinaryIO): The seekable binary stream to write to.
+        frame_size (int): The number of input bytes per frame.
+        source_hash: Optional hashlib object fed with every input chunk;
+            a SHA-256 is used when it is None.
+        pool (BufferPool): The pool the frame buffer is taken from.
+        compression (str): One of ``COMPRESSIONS``.
+        codec (str): The name of a registered codec.
+
+    Returns:
+        StreamStats: The byte counts and the input digest. The output is
+            not hashed, since its header changes after the frames.
+
+    Raises:
+        ValueError: If the compression or codec is not supported or the
+            target is not seekable.
+    """
+    compress = _compressor(compression)
+    text_codec = get_codec(codec)
+    frame_size = align_chunk_size(frame_size)
+    source_hash = source_hash or hashlib.sha256()
+    pool = pool or default_pool
+    misses = pool.misses
+    stats = StreamStats()
+
+    if not target.seekable():
+        raise ValueError("Container output must be seekable")
+
+    header = ContainerHeader(frame_size=frame_size, codec=codec,
+                             compression=compression)
+    start = target.tell()
+    target.write(header.to_bytes())
+
+    buffer = pool.acquire(frame_size)
+    view = memoryview(buffer)
+    try:
+        while True:
+            started = perf_counter()
+            count = _read_frame(source, view)
+            stats.read_seconds += perf_counter() - started
+            if not count:
+                break
+
+            data = view[:count]
+            stats.bytes_read += count
+            _digest(source_hash, data, stats)
+
+            started = perf_counter()
+            payload = compress(data) if compress else None
+            line = _frame_line(stats.chunks, data, payload, text_codec)
+            stats.transform_seconds += perf_counter() - started
+            stats.compressed_bytes += len(payload) if compress else count
+
+            started = perf_counter()
+            target.write(line)
+            stats.write_seconds += perf_counter() - started
+            stats.bytes_written += len(line)
+            stats.chunks += 1
+    finally:
+        view.release()
+        pool.release(buffer)
+
+    header.size = stats.bytes_read
+    header.sha256 = source_hash.hexdigest()
+    end = target.tell()
+    target.seek(start)
+    target.write(header.to_bytes())
+    target.seek(end)
+    stats.bytes_written += len(header.to_bytes())
+
+    stats.pool_misses = pool.misses - misses
+    stats.input_hash = _hexdigest(source_hash)
+    return stats
+
+
+def container_decode(source: BinaryIO, target: BinaryIO,
+                     source_hash: Any = None,
+                     target_hash: Any = None) -> StreamStats:
+    """
+    Decodes a framed container, verifying every frame as it is read.
+
+    Args:
+        source (BinaryIO): The container stream to read from.
+        target (BinaryIO): The binary stream to write to.
+        source_hash: Optional hashlib object fed with every input line.
+        target_hash: Optional hashlib object fed with every output chunk;
+            a SHA-256 is used when it is None, to check the header digest.
+
+    Returns:
+        StreamStats: The byte counts and digests of both streams.
+
+    Raises:
+        FrameError: On the first malformed, missing or corrupt frame, or
+            if the output does not match the header's size and digest.
+    """
+    target_hash = target_hash or hashlib.sha256()
+    stats = StreamStats()
+
+    started = perf_counter()
+    header, line = read_header(source)
+    stats.read_seconds += perf_counter() - started
+    offset = stats.bytes_read = len(line)
+    _digest(source_hash, line, stats)
+
+    for index in range(header.frames):
+        started = perf_counter()
+        line = source.readline(header.max_line)
+        stats.read_seconds += perf_counter() - started
+        if not line:
+            raise FrameError(
+                f"Container ends before frame {index} of {header.frames}",
+                frame=index, offset=offset)
+        _digest(source_hash, line, stats)
+
+        started = perf_counter()
+        data, payload_size = _decode_frame(line, index, header, offset)
+        stats.transform_seconds += perf_counter() - started
+        stats.compressed_bytes += payload_size
+
+        started = perf_counter()
+        target.write(data)
+        stats.write_seconds += perf_counter() - started
+        _digest(target_hash, data, stats)
+
+        offset += len(line)
+        stats.bytes_read += len(line)
+        stats.bytes_written += len(data)
+        stats.chunks += 1
+
+    if source.read(1):
+        raise FrameError(f"Unexpected data after the last frame at byte "
+                         f"{offset}", frame=header.frames, offset=offset)
+    if target_hash.hexdigest() != header.sha256:
+        raise FrameError("Decoded data does not match the container SHA-256")
+
+    stats.input_hash = _hexdigest(source_hash)
+    stats.output_hash = _hexdigest(target_hash)
+    return stats
+
+
+def _decode_frames(input_path: str, output_path: str, offset: int,
+                   length: int, header: ContainerHeader,
+                   data_start: int) -> Tuple[StreamStats, Optional[int], int]:
+    """
+    Decodes the frames whose lines start inside one segment of the input.
+
+    Returns the statistics, the index of the first frame (None if the
+    segment holds no frame start) and the number of frames decoded.
+    """
+    stats = StreamStats()
+    first, count = None, 0
+    end = offset + length
+    with open(input_path, 'rb') as source, \
+            open(output_path, 'r+b') as target:
+        source.seek(offset)
+        if offset > data_start:
+            # Lines are found by the break that ends the previous one.
+            source.seek(offset - 1)
+            offset += len(source.readline(header.max_line)) - 1
+
+        while offset < end:
+            started = perf_counter()
+            line = source.readline(header.max_line)
+            stats.read_seconds += perf_counter() - started
+            if not line:
+                break
+
+            if first is None:
+                # Later frames of the segment must follow the first one.
+                try:
+                    first = int(line[:8], 16)
+                except ValueError as err:
+                    raise FrameError(
+                        f"Frame at byte {offset} is malformed",
+                        offset=offset) from err
+            expected = first + count
+
+            started = perf_counter()
+            data, payload_size = _decode_frame(line, expected, header, offset)
+            stats.transform_seconds += perf_counter() - started
+            stats.compressed_bytes += payload_size
+
+            started = perf_counter()
+            target.seek(expected * header.frame_size)
+            target.write(data)
+            stats.write_seconds += perf_counter() - started
+
+            offset += len(line)
+            stats.bytes_read += len(line)
+            stats.bytes_written += len(data)
+            stats.chunks += 1
+            count += 1
+    return stats, first, count
+
+
+def parallel_container_decode(input_path: str, output_path: str,
+                              jobs: int = None,
+                              segment_size: int = DEFAULT_SEGMENT_SIZE
+                              ) -> StreamStats:
+    """
+    Decodes a framed container with a pool of worker processes.
+
+    The input is cut into byte segments; every worker decodes the frames
+    whose lines start in its segment, verifies their CRC32 and writes
+    them to their offset in the preallocated output. The output is then
+    read back once to check the whole-file SHA-256 of the header.
+
+    Args:
+        input_path (str): The container file to decode.
+        output_path (str): The file to write the decoded output to.
+        jobs (int): The number of worker processes, 0 or None for all cores.
+        segment_size (int): The largest segment handed to one task.
+
+    Returns:
+        StreamStats: The byte counts of the input and output files and
+            the output digest.
+
+    Raises:
+        FrameError: On the first bad frame of the earliest failing
+            segment, if frames are missing or repeated, or if the output
+            does not match the header digest.
+    """
+    jobs = resolve_jobs(jobs)
+    size = os.path.getsize(input_path)
+    with open(input_path, 'rb') as source:
+        header, line = read_header(source)
+    data_start = len(line)
+
+    with open(output_path, 'wb') as target:
+        target.truncate(header.size)
+
+    segments = plan_segments(size - data_start, jobs, segment_size,
+                             header.max_line, block=1)
+    args = [(input_path, output_path, data_start + offset, length, header,
+             data_start) for offset, length in segments]
+    results = _run_tasks(_decode_frames, args, jobs)
+
+    expected = 0
+    for _, first, count in results:
+        if first is None:
+            continue
+        if first != expected:
+            raise FrameError(f"Frame {expected} is missing",
+                             frame=expected)
+        expected += count
+    if expected != header.frames:
+        raise FrameError(f"Container ends before frame {expected} of "
+                         f"{header.frames}", frame=expected)
+
+    stats = StreamStats.combine(stats for stats, _, _ in results)
+    stats.bytes_read += data_start
+
+    target_hash = hashlib.sha256()
+    with open(output_path, 'rb') as target:
+        while chunk := target.read(header.frame_size):
+            _digest(target_hash, chunk, stats)
+    if target_hash.hexdigest() != header.sha256:
+        raise FrameError("Decoded data does not match the container SHA-256")
+
+    stats.output_hash = target_hash.hexdigest()
+    return stats
+
+
+__all__ = [
+    "COMPRESSIONS",
+    "DEFAULT_FRAME_SIZE",
+    "ContainerHeader",
+    "FrameError",
+    "container_decode",
+    "container_encode",
+    "is_container",
+    "parallel_container_decode",
+]
@@ -0,0 +1,112 @@
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional
+
+# Suffix of the sidecar manifest written next to each output file.
+MANIFEST_SUFFIX = ".amy.json"
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output_path: str) -> str:
+    """Returns the path of the manifest that describes an output file."""
+    return f"{output_path}{MANIFEST_SUFFIX}"
+
+
+@dataclass
+class Manifest:
+    """
+    Describes the input an output file was produced from.
+
+    The parameters hold every option that changes the output bytes, so a
+    manifest written with other parameters never matches. Encoded outputs
+    also keep a digest per ``block_size`` bytes of input, used to patch
+    only the changed ranges of the output.
+    """
+    input_path: str
+    input_size: int
+    input_mtime_ns: int
+    input_hash: str
+    output_size: int
+    output_mtime_ns: int
+    output_hash: str
+    parameters: dict = field(default_factory=dict)
+    block_size: int = 0
+    blocks: List[str] = field(default_factory=list)
+    version: int = MANIFEST_VERSION
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Manifest"]:
+        """Reads a manifest, returning None if it is missing or invalid."""
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get("version") != MANIFEST_VERSION:
+                return None
+            return cls(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        """Writes the manifest atomically, replacing any previous one."""
+        temporary = f"{path}.tmp"
+        try:
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(asdict(self), file, indent=2, sort_keys=True)
+            os.replace(temporary, path)
+        except OSError as err:
+            raise ValueError(
+                f"Failed to write manifest '{path}': {err}") from err
+
+    def matches(self, input_path: str, output_path: str, parameters: dict,
+                input_digest: Callable[[str], str]) -> bool:
+        """
+        Checks whether the output is still the result of the current input.
+
+        Sizes and ``mtime_ns`` are compared first; the input is only hashed
+        when its size is unchanged but its modification time is not, so a
+        touched but identical input is still recognized.
+
+        Args:
+            input_path (str): The current input file.
+            output_path (str): The existing output file.
+            parameters (dict): The codec parameters of the current run.
+            input_digest (Callable[[str], str]): Returns the SHA-256 of a
+                file, consulted only when the timestamps differ.
+
+        Returns:
+            bool: True if the job can be skipped.
+        """
+        try:
+            input_stat = os.stat(input_path)
+        except OSError:
+            return False
+
+        if not self.output_intact(output_path, parameters):
+            return False
+        if input_stat.st_size != self.input_size:
+            return False
+        if input_stat.st_mtime_ns == self.input_mtime_ns:
+            return True
+        return input_digest(input_path) == self.input_hash
+
+    def output_intact(self, output_path: str, parameters: dict) -> bool:
+        """
+        Checks that the output was made with the same parameters and has
+        not been modified since the manifest was written.
+        """
+        try:
+            output_stat = os.stat(output_path)
+        except OSError:
+            return False
+
+        return parameters == self.parameters and \
+            (output_stat.st_size, output_stat.st_mtime_ns) == \
+            (self.output_size, self.output_mtime_ns)
+
+
+__all__ = [
+    "MANIFEST_SUFFIX",
+    "Manifest",
+    "manifest_path",
+]
@@ -0,0 +1,193 @@
+import mmap
+import os
+from time import perf_counter
+from typing import Any
+
+from .buffers import BufferPool, default_pool
+from .registry import BASE64, TextCodec
+from .stream import (
+    DEFAULT_CHUNK_SIZE, StreamStats, align_chunk_size, check_padding,
+    decode_stream, encode_stream, extract_symbols, _digest, _hexdigest)
+
+
+def mmap_encode(input_path: str, output_path: str,
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                source_hash: Any = None,
+                target_hash: Any = None,
+                codec: TextCodec = BASE64) -> StreamStats:
+    """
+    Encodes a file to Base64 between two memory mappings.
+
+    The output file is preallocated to its encoded size, 4*ceil(n/3)
+    bytes for Base64, and mapped, and
+    every chunk is encoded from a memoryview of the input mapping straight
+    into its slot of the output mapping. Readahead and writeback are left
+    to the operating system, so page-ins are timed as part of the
+    transform and page-outs are not timed at all.
+
+    Args:
+        input_path (str): The file to encode.
+        output_path (str): The file to write the Base64 output to.
+        chunk_size (int): The number of input bytes to encode per step.
+        source_hash: Optional hashlib object fed with every input chunk.
+        target_hash: Optional hashlib object fed with every output chunk.
+        codec (TextCodec): The encoding to apply.
+
+    Returns:
+        StreamStats: The byte counts and digests of both files.
+    """
+    chunk_size = align_chunk_size(chunk_size, codec.block)
+    size = os.path.getsize(input_path)
+    output_size = codec.encoded_size(size)
+
+    with open(input_path, 'rb') as source, open(output_path, 'w+b') as target:
+        if size == 0:
+            # Empty files cannot be mapped.
+            return encode_stream(source, target, chunk_size,
+                                 source_hash, target_hash, codec=codec)
+
+        target.truncate(output_size)
+        stats = StreamStats(bytes_read=size, bytes_written=output_size)
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as inp, \
+                mmap.mmap(target.fileno(), output_size) as out, \
+                memoryview(inp) as view:
+            for offset in range(0, size, chunk_size):
+                stats.chunks += 1
+                chunk = view[offset:offset + chunk_size]
+
+                started = perf_counter()
+                encoded = codec.encode(chunk)
+                stats.transform_seconds += perf_counter() - started
+
+                started = perf_counter()
+                position = offset // codec.block * codec.encoded_block
+                out[position:position + len(encoded)] = encoded
+                stats.write_seconds += perf_counter() - started
+
+                _digest(source_hash, chunk, stats)
+                _digest(target_hash, encoded, stats)
+                chunk.release()
+
+    stats.input_hash = _hexdigest(source_hash)
+    stats.output_hash = _hexdigest(target_hash)
+    return stats
+
+
+def _place(out: mmap.mmap, decoded: bytes, stats: StreamStats,
+           target_hash: Any) -> None:
+    """Copies a decoded chunk after the bytes already in the output mapping."""
+    started = perf_counter()
+    written = stats.bytes_written
+    out[written:written + len(decoded)] = decoded
+    stats.write_seconds += perf_counter() - started
+    stats.bytes_written += len(decoded)
+    _digest(target_hash, decoded, stats)
+
+
+def mmap_decode(input_path: str, output_path: str,
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                source_hash: Any = None,
+                target_hash: Any = None,
+                codec: TextCodec = BASE64,
+                pool: BufferPool = None) -> StreamStats:
+    """
+    Decodes a Base64 file between two memory mappings.
+
+    The exact output size is only known once whitespace and padding have
+    been seen, so the output is mapped at its upper bound, 3 bytes per 4
+    input bytes for Base64, and truncated to the decoded length afterwards.
+    Every chunk is copied from the input mapping into a pooled buffer and
+    its symbols staged in another, as ``decode_stream`` does, so a warm
+    loop creates no buffers of its own.
+
+    Args:
+        input_path (str): The Base64 file to decode.
+        output_path (str): The file to write the decoded output to.
+        chunk_size (int): The number of input bytes to decode per step.
+        source_hash: Optional hashlib object fed with every input chunk.
+        target_hash: Optional hashlib object fed with every output chunk.
+        codec (TextCodec): The encoding to undo.
+        pool (BufferPool): The pool chunk buffers are taken from,
+            the process-wide pool by default.
+
+    Returns:
+        StreamStats: The byte counts and digests of both files.
+
+    Raises:
+        binascii.Error: If the input is not valid for the codec.
+    """
+    chunk_size = align_chunk_size(chunk_size, codec.encoded_block)
+    size = os.path.getsize(input_path)
+    capacity = codec.decoded_size(size)
+
+    with open(input_path, 'rb') as source, open(output_path, 'w+b') as target:
+        if capacity == 0:
+            # Too short to map; at most one group of symbols.
+            return decode_stream(source, target, chunk_size,
+                                 source_hash, target_hash, pool=pool,
+                                 codec=codec)
+
+        target.truncate(capacity)
+        stats = StreamStats(bytes_read=size)
+        pool = pool or default_pool
+        misses = pool.misses
+        buffer = pool.acquire(chunk_size)
+        staging = pool.acquire(chunk_size + codec.encoded_block)
+        try:
+            with mmap.mmap(source.fileno(), 0,
+                           access=mmap.ACCESS_READ) as inp, \
+                    mmap.mmap(target.fileno(), capacity) as out, \
+                    memoryview(inp) as view, memoryview(buffer) as chunk, \
+                    memoryview(staging) as staged:
+                pending = 0
+                padded = False
+                for offset in range(0, size, chunk_size):
+                    stats.chunks += 1
+                    # Copying the chunk out of the mapping pages it in.
+                    started = perf_counter()
+                    count = min(chunk_size, size - offset)
+                    chunk[:count] = view[offset:offset + count]
+                    stats.read_seconds += perf_counter() - started
+                    _digest(source_hash, chunk[:count], stats)
+
+                    # Only a short final chunk needs a copy to translate.
+                    started = perf_counter()
+                    symbols = extract_symbols(
+                        buffer if count == chunk_size
+                        else chunk[:count].tobytes(), codec.alphabet)
+                    filled = pending + len(symbols)
+                    staged[pending:filled] = symbols
+                    cut = filled - (filled % codec.encoded_block)
+                    padded = check_padding(staging, cut, codec, padded)
+                    decoded = codec.decode(staged[:cut])
+                    pending = filled - cut
+                    staged[:pending] = staged[cut:filled]
+                    stats.transform_seconds += perf_counter() - started
+
+                    if decoded:
+                        _place(out, decoded, stats, target_hash)
+
+                if pending:
+                    # Base64 reports the incomplete group as incorrect
+                    # padding; codecs with a shortened final group decode it.
+                    started = perf_counter()
+                    check_padding(staging, pending, codec, padded)
+                    decoded = codec.decode(staged[:pending])
+                    stats.transform_seconds += perf_counter() - started
+                    _place(out, decoded, stats, target_hash)
+        finally:
+            pool.release(buffer)
+            pool.release(staging)
+
+        target.truncate(stats.bytes_written)
+
+    stats.pool_misses = pool.misses - misses
+    stats.input_hash = _hexdigest(source_hash)
+    stats.output_hash = _hexdigest(target_hash)
+    return stats
+
+
+__all__ = [
+    "mmap_decode",
+    "mmap_encode",
+]
@@ -0,0 +1,259 @@
+import binascii
+import os
+from concurrent import futures
+from itertools import accumulate
+from typing import BinaryIO, Callable, List, Tuple
+
+from .registry import BASE64, TextCodec
+from .stream import (
+    DEFAULT_CHUNK_SIZE, ENCODE_BLOCK, WHITESPACE, StreamStats,
+    align_chunk_size, decode_stream, encode_stream)
+
+# Upper bound for the input handled by a single task; more tasks than
+# workers keep the pool busy when some segments finish early.
+DEFAULT_SEGMENT_SIZE = 48 * 1024 * 1024
+
+# Bytes read per step while looking for the padding at the end of the input.
+TAIL_READ_SIZE = 4096
+
+
+def resolve_jobs(jobs: int = None) -> int:
+    """Returns the number of worker processes, 0 or None meaning all cores."""
+    if not jobs:
+        return os.cpu_count() or 1
+    if jobs < 0:
+        raise ValueError(f"Number of jobs must not be negative, got {jobs}.")
+    return jobs
+
+
+def plan_segments(size: int, jobs: int,
+                  segment_size: int = DEFAULT_SEGMENT_SIZE,
+                  min_segment_size: int = DEFAULT_CHUNK_SIZE,
+                  block: int = ENCODE_BLOCK) -> List[Tuple[int, int]]:
+    """
+    Splits an input of the given size into block-aligned segments.
+
+    Args:
+        size (int): The input size in bytes.
+        jobs (int): The number of workers the segments are spread over.
+        segment_size (int): The largest segment handed to one task.
+        min_segment_size (int): The smallest segment worth a task.
+        block (int): The number of bytes every segment length is a
+            multiple of, except for the last one.
+
+    Returns:
+        List[Tuple[int, int]]: The (offset, length) of every segment.
+    """
+    per_job = -(-size // jobs)
+    length = max(min(per_job, segment_size), min_segment_size)
+    length += -length % block
+
+    return [(offset, min(length, size - offset))
+            for offset in range(0, size, length)]
+
+
+def _encode_segment(input_path: str, output_path: str, offset: int,
+                    length: int, chunk_size: int,
+                    codec: TextCodec = BASE64) -> StreamStats:
+    """Encodes one input segment into its slot of the output file."""
+    with open(input_path, 'rb') as source, \
+            open(output_path, 'r+b') as target:
+        source.seek(offset)
+        target.seek(offset // codec.block * codec.encoded_block)
+        return encode_stream(source, target, chunk_size=chunk_size,
+                             limit=length, codec=codec)
+
+
+def _run_tasks(function: Callable, args: List[tuple], jobs: int) -> list:
+    """Runs the function over all argument tuples, in a pool if useful."""
+    if jobs == 1 or len(args) <= 1:
+        return [function(*arg) for arg in args]
+
+    workers = min(jobs, len(args))
+    with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = [pool.submit(function, *arg) for arg in args]
+        return [future.result() for future in pending]
+
+
+def parallel_encode(input_path: str, output_path: str, jobs: int = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    segment_size: int = DEFAULT_SEGMENT_SIZE,
+                    codec: TextCodec = BASE64) -> StreamStats:
+    """
+    Encodes a file to Base64 using a pool of worker processes.
+
+    The output file is preallocated to its final size, and every worker
+    writes the encoding of its segment straight to the precomputed offset.
+    Digests are not computed, since no single process sees the whole file,
+    and stage times are summed over all workers.
+
+    Args:
+        input_path (str): The file to encode.
+        output_path (str): The file to write the Base64 output to.
+        jobs (int): The number of worker processes, 0 or None for all cores.
+        chunk_size (int): The number of input bytes encoded per step.
+        segment_size (int): The largest segment handed to one task.
+        codec (TextCodec): The encoding to apply.
+
+    Returns:
+        StreamStats: The byte counts of the input and output files.
+    """
+    jobs = resolve_jobs(jobs)
+    chunk_size = align_chunk_size(chunk_size, codec.block)
+    size = os.path.getsize(input_path)
+
+    with open(output_path, 'wb') as target:
+        target.truncate(codec.encoded_size(size))
+
+    segments = plan_segments(size, jobs, segment_size, chunk_size,
+                             block=codec.block)
+    args = [(input_path, output_path, offset, length, chunk_size, codec)
+            for offset, length in segments]
+
+    results = _run_tasks(_encode_segment, args, jobs)
+
+    return StreamStats.combine(results)
+
+
+def _count_symbols(input_path: str, offset: int, length: int,
+                   chunk_size: int) -> int:
+    """Counts the non-whitespace bytes in one segment of a file."""
+    count = 0
+    with open(input_path, 'rb') as source:
+        source.seek(offset)
+        while length > 0:
+            chunk = source.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            count += len(chunk.translate(None, WHITESPACE))
+    return count
+
+
+def _skip_symbols(source: BinaryIO, offset: int, count: int) -> int:
+    """
+    Returns the offset just past the next ``count`` non-whitespace bytes
+    at or after ``offset``, or the end of the file if there are fewer.
+    """
+    source.seek(offset)
+    while count > 0:
+        window = source.read(4096)
+        if not window:
+            break
+        for byte in window:
+            offset += 1
+            if byte not in WHITESPACE:
+                count -= 1
+                if count == 0:
+                    break
+    return offset
+
+
+def _trailing_padding(source: BinaryIO, size: int,
+                      padding: bytes = b"=", group: int = 4) -> int:
+    """
+    Returns the number of padding symbols that end the encoded input.
+
+    The input is read backwards until a whole group of symbols has been
+    seen, however much whitespace trails it.
+    """
+    if not padding:
+        return 0
+    tail = b""
+    end = size
+    while end > 0 and len(tail) < group:
+        start = max(0, end - TAIL_READ_SIZE)
+        source.seek(start)
+        tail = source.read(end - start).translate(None, WHITESPACE) + tail
+        end = start
+    return len(tail) - len(tail.rstrip(padding))
+
+
+def _decode_segment(input_path: str, output_path: str, offset: int,
+                    length: int, output_offset: int, chunk_size: int,
+                    codec: TextCodec = BASE64) -> StreamStats:
+    """Decodes one group-aligned segment into its slot of the output."""
+    with open(input_path, 'rb') as source, \
+            open(output_path, 'r+b') as target:
+        source.seek(offset)
+        target.seek(output_offset)
+        return decode_stream(source, target, chunk_size=chunk_size,
+                             limit=length, codec=codec)
+
+
+def parallel_decode(input_path: str, output_path: str, jobs: int = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    segment_size: int = DEFAULT_SEGMENT_SIZE,
+                    codec: TextCodec = BASE64) -> StreamStats:
+    """
+    Decodes a Base64 file using a pool of worker processes.
+
+    A first parallel pass counts the symbols in every raw segment. Each
+    cut is then moved forward, skipping whitespace, until the symbols
+    before it form whole groups, which fixes the output offset of every
+    segment, 3 bytes per 4-symbol group for Base64. The output file is
+    preallocated and the segments are decoded into it concurrently; only
+    the final segment carries padding or a shortened group.
+
+    Args:
+        input_path (str): The Base64 file to decode.
+        output_path (str): The file to write the decoded output to.
+        jobs (int): The number of worker processes, 0 or None for all cores.
+        chunk_size (int): The number of input bytes decoded per step.
+        segment_size (int): The largest segment handed to one task.
+        codec (TextCodec): The encoding to undo.
+
+    Returns:
+        StreamStats: The byte counts of the input and output files.
+
+    Raises:
+        binascii.Error: If the input is not valid for the codec.
+    """
+    jobs = resolve_jobs(jobs)
+    group = codec.encoded_block
+    chunk_size = align_chunk_size(chunk_size, group)
+    size = os.path.getsize(input_path)
+
+    segments = plan_segments(size, jobs, segment_size, chunk_size, block=1)
+    counts = _run_tasks(
+        _count_symbols,
+        [(input_path, offset, length, chunk_size)
+         for offset, length in segments],
+        jobs)
+    symbols = sum(counts)
+    if codec.padding and symbols % group:
+        raise binascii.Error("Incorrect padding")
+
+    # Move every cut past the symbols that complete the group it splits.
+    cuts = [(0, 0)]
+    with open(input_path, 'rb') as source:
+        padding = _trailing_padding(source, size, codec.padding, group)
+        for (offset, _), before in zip(segments[1:], accumulate(counts)):
+            skip = -before % group
+            cut = _skip_symbols(source, offset, skip)
+            if cut > cuts[-1][0]:
+                cuts.append((cut, before + skip))
+
+    decoded_size = codec.decoded_size(symbols - padding)
+    with open(output_path, 'wb') as target:
+        target.truncate(decoded_size)
+
+    ends = [cut for cut, _ in cuts[1:]] + [size]
+    args = [(input_path, output_path, offset, end - offset,
+             before // group * codec.block, chunk_size, codec)
+            for (offset, before), end in zip(cuts, ends)]
+    results = _run_tasks(_decode_segment, args, jobs)
+
+    stats = StreamStats.combine(results)
+    if stats.bytes_written != decoded_size:
+        raise binascii.Error("Padding found before the end of the input")
+    return stats
+
+
+__all__ = [
+    "DEFAULT_SEGMENT_SIZE",
+    "parallel_decode",
+    "parallel_encode",
+    "plan_segments",
+    "resolve_jobs",
+]
@@ -0,0 +1,118 @@
+import hashlib
+import os
+from time import perf_counter
+from typing import Any, List, Sequence, Tuple
+
+from .buffers import BufferPool, default_pool
+from .registry import BASE64, TextCodec
+from .stream import StreamStats, align_chunk_size, _digest, _hexdigest
+
+# Input block whose digest is kept in the manifest: 768 KiB of input maps
+# onto exactly 1 MiB of Base64 output.
+DEFAULT_BLOCK_SIZE = 3 * 256 * 1024
+
+# Size of the per-block digests in bytes.
+BLOCK_DIGEST_SIZE = 16
+
+
+def block_digest(data: Any) -> str:
+    """Returns the digest identifying the content of one input block."""
+    return hashlib.blake2b(data, digest_size=BLOCK_DIGEST_SIZE).hexdigest()
+
+
+def patch_encode(input_path: str, output_path: str,
+                 blocks: Sequence[str] = (),
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 source_hash: Any = None,
+                 pool: BufferPool = None,
+                 codec: TextCodec = BASE64) -> Tuple[StreamStats, List[str]]:
+    """
+    Re-encodes only the blocks of the input whose digest changed.
+
+    Every ``block_size`` bytes of input encode to a fixed range of the
+    output, so a block whose digest matches ``blocks`` is left alone and
+    only changed blocks are encoded and written in place. The output is
+    then cut to the encoded length of the input. With no previous digests
+    this is a full encode that also returns the digests.
+
+    The caller must make sure the existing output is the unmodified
+    result of the input the digests were taken from.
+
+    Args:
+        input_path (str): The file to encode.
+        output_path (str): The Base64 file to patch or create.
+        blocks (Sequence[str]): The block digests of the previous input.
+        block_size (int): The input bytes per block, rounded down to
+            whole groups of the codec.
+        source_hash: Optional hashlib object fed with the whole input.
+        pool (BufferPool): The pool the block buffer is taken from.
+        codec (TextCodec): The encoding of the output.
+
+    Returns:
+        Tuple[StreamStats, List[str]]: The statistics, where
+            ``bytes_written`` only counts patched bytes and ``chunks`` the
+            patched blocks, and the block digests of the current input.
+    """
+    block_size = align_chunk_size(block_size, codec.block)
+    encoded_block = block_size // codec.block * codec.encoded_block
+    pool = pool or default_pool
+    misses = pool.misses
+    stats = StreamStats()
+    digests = []
+
+    mode = 'r+b' if os.path.isfile(output_path) else 'wb'
+    buffer = pool.acquire(block_size)
+    view = memoryview(buffer)
+    try:
+        with open(input_path, 'rb') as source, \
+                open(output_path, mode) as target:
+            while True:
+                started = perf_counter()
+                count = source.readinto(view)
+                stats.read_seconds += perf_counter() - started
+                if not count:
+                    break
+
+                data = view[:count]
+                stats.bytes_read += count
+                _digest(source_hash, data, stats)
+
+                started = perf_counter()
+                digest = block_digest(data)
+                stats.hash_seconds += perf_counter() - started
+
+                index = len(digests)
+                digests.append(digest)
+                if index < len(blocks) and blocks[index] == digest:
+                    continue
+
+                started = perf_counter()
+                encoded = codec.encode(data)
+                stats.transform_seconds += perf_counter() - started
+
+                started = perf_counter()
+                target.seek(index * encoded_block)
+                target.write(encoded)
+                stats.write_seconds += perf_counter() - started
+                stats.bytes_written += len(encoded)
+                stats.chunks += 1
+
+            target.truncate(codec.encoded_size(stats.bytes_read))
+    except OSError as err:
+        raise ValueError(
+            f"Failed to patch '{output_path}' from '{input_path}': "
+            f"{err}") from err
+    finally:
+        view.release()
+        pool.release(buffer)
+
+    stats.pool_misses = pool.misses - misses
+    stats.input_hash = _hexdigest(source_hash)
+    return stats, digests
+
+
+__all__ = [
+    "DEFAULT_BLOCK_SIZE",
+    "block_digest",
+    "patch_encode",
+]
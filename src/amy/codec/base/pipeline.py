@@ -0,0 +1,299 @@
+import queue
+import threading
+from time import perf_counter
+from typing import Any, BinaryIO, List
+
+from .buffers import BufferPool, default_pool
+from .registry import BASE64, TextCodec
+from .stream import (
+    DEFAULT_CHUNK_SIZE, StreamStats, align_chunk_size, check_padding,
+    extract_symbols, _digest, _hexdigest)
+
+# Number of chunks that may wait between two stages. Higher values hide
+# more I/O latency at the cost of read_ahead chunks of memory per queue.
+DEFAULT_READ_AHEAD = 4
+
+_DONE = object()
+
+
+class _EncodeTransform:
+    """Encodes chunks of any length, carrying partial groups between them."""
+
+    def __init__(self, codec: TextCodec = BASE64):
+        self._codec = codec
+        self._pending = b""
+
+    def feed(self, buffer: bytearray, count: int) -> List[bytes]:
+        """Encodes the complete groups of a chunk."""
+        block = self._codec.block
+        encoded = []
+        with memoryview(buffer) as view:
+            start = 0
+            if self._pending:
+                start = min(block - len(self._pending), count)
+                self._pending += view[:start].tobytes()
+                if len(self._pending) < block:
+                    return encoded
+                encoded.append(self._codec.encode(self._pending))
+
+            cut = count - ((count - start) % block)
+            if cut > start:
+                encoded.append(self._codec.encode(view[start:cut]))
+            self._pending = view[cut:count].tobytes()
+        return encoded
+
+    def flush(self) -> List[bytes]:
+        """Encodes the final partial group, if any."""
+        if not self._pending:
+            return []
+        return [self._codec.encode(self._pending)]
+
+    def close(self) -> None:
+        """Releases held resources."""
+
+
+class _DecodeTransform:
+    """Decodes chunks of encoded input, carrying partial groups between them."""
+
+    def __init__(self, pool: BufferPool, chunk_size: int,
+                 codec: TextCodec = BASE64):
+        self._pool = pool
+        self._codec = codec
+        self._staging = pool.acquire(chunk_size + codec.encoded_block)
+        self._pending = 0
+        self._padded = False
+
+    def feed(self, buffer: bytearray, count: int) -> List[bytes]:
+        """Decodes the complete groups of symbols in a chunk."""
+        symbols = extract_symbols(
+            buffer if count == len(buffer) else buffer[:count],
+            self._codec.alphabet)
+
+        with memoryview(self._staging) as staged:
+            filled = self._pending + len(symbols)
+            staged[self._pending:filled] = symbols
+            cut = filled - (filled % self._codec.encoded_block)
+            self._padded = check_padding(self._staging, cut, self._codec,
+                                         self._padded)
+            decoded = [self._codec.decode(staged[:cut])] if cut else []
+            self._pending = filled - cut
+            staged[:self._pending] = staged[cut:filled]
+        return decoded
+
+    def flush(self) -> List[bytes]:
+        """Decodes the carried symbols, reporting an incomplete group."""
+        if not self._pending:
+            return []
+        # An incomplete trailing group is reported as incorrect padding
+        # unless the codec shortens its final group.
+        check_padding(self._staging, self._pending, self._codec,
+                      self._padded)
+        return [self._codec.decode(self._staging[:self._pending])]
+
+    def close(self) -> None:
+        """Returns the staging buffer to the pool."""
+        self._pool.release(self._staging)
+
+
+def _read(source: BinaryIO, chunks: queue.Queue, pool: BufferPool,
+          chunk_size: int, stats: StreamStats, source_hash: Any,
+          stop: threading.Event, errors: list) -> None:
+    """Reader stage: fills pooled buffers and queues them."""
+    try:
+        while not stop.is_set():
+            buffer = pool.acquire(chunk_size)
+            started = perf_counter()
+            count = source.readinto(buffer)
+            stats.read_seconds += perf_counter() - started
+            if not count:
+                pool.release(buffer)
+                break
+
+            stats.chunks += 1
+            stats.bytes_read += count
+            with memoryview(buffer) as view:
+                _digest(source_hash, view[:count], stats)
+            chunks.put((buffer, count))
+    except Exception as err:  # pylint: disable=broad-except
+        errors.append(err)
+    finally:
+        chunks.put(_DONE)
+
+
+def _write(target: BinaryIO, results: queue.Queue, stats: StreamStats,
+           target_hash: Any, errors: list) -> None:
+    """Writer stage: writes queued results until told to stop."""
+    failed = False
+    while True:
+        data = results.get()
+        if data is _DONE:
+            break
+        if failed:
+            # Keep draining so the transform stage never blocks.
+            continue
+        try:
+            started = perf_counter()
+            target.write(data)
+            stats.write_seconds += perf_counter() - started
+            stats.bytes_written += len(data)
+            _digest(target_hash, data, stats)
+        except Exception as err:  # pylint: disable=broad-except
+            errors.append(err)
+            failed = True
+
+
+def _pipeline_pool(pool: BufferPool, read_ahead: int) -> BufferPool:
+    """
+    Returns the caller's pool, or the process-wide one grown to hold a
+    buffer for every queued chunk and stage, so consecutive jobs reuse it.
+    """
+    if pool is not None:
+        return pool
+    default_pool.reserve(read_ahead + 2)
+    return default_pool
+
+
+def _run_pipeline(source: BinaryIO, target: BinaryIO, transform: Any,
+                  pool: BufferPool, chunk_size: int, source_hash: Any,
+                  target_hash: Any, read_ahead: int) -> StreamStats:
+    """Runs the reader, transform and writer stages until the source ends."""
+    # Each stage counts into its own stats so no field is shared
+    # between threads.
+    stats = StreamStats()
+    read_stats = StreamStats()
+    write_stats = StreamStats()
+    misses = pool.misses
+    errors = []
+    stop = threading.Event()
+    chunks = queue.Queue(maxsize=read_ahead)
+    results = queue.Queue(maxsize=read_ahead)
+
+    reader = threading.Thread(
+        target=_read, name="amy-reader", daemon=True,
+        args=(source, chunks, pool, chunk_size, read_stats, source_hash,
+              stop, errors))
+    writer = threading.Thread(
+        target=_write, name="amy-writer", daemon=True,
+        args=(target, results, write_stats, target_hash, errors))
+    reader.start()
+    writer.start()
+
+    done = False
+    try:
+        while not errors:
+            item = chunks.get()
+            if item is _DONE:
+                done = True
+                break
+
+            buffer, count = item
+            try:
+                started = perf_counter()
+                transformed = transform.feed(buffer, count)
+                stats.transform_seconds += perf_counter() - started
+            finally:
+                pool.release(buffer)
+            for data in transformed:
+                results.put(data)
+
+        if done and not errors:
+            for data in transform.flush():
+                results.put(data)
+    finally:
+        # Unblock the reader if the transform stopped early.
+        stop.set()
+        while not done:
+            done = chunks.get() is _DONE
+        results.put(_DONE)
+        reader.join()
+        writer.join()
+        transform.close()
+
+    if errors:
+        raise errors[0]
+
+    stats = StreamStats.combine([stats, read_stats, write_stats])
+    stats.pool_misses = pool.misses - misses
+    stats.input_hash = _hexdigest(source_hash)
+    stats.output_hash = _hexdigest(target_hash)
+    return stats
+
+
+def pipeline_encode(source: BinaryIO, target: BinaryIO,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    source_hash: Any = None,
+                    target_hash: Any = None,
+                    read_ahead: int = DEFAULT_READ_AHEAD,
+                    pool: BufferPool = None,
+                    codec: TextCodec = BASE64) -> StreamStats:
+    """
+    Encodes the source stream to Base64 with overlapped I/O.
+
+    A reader thread fills buffers ahead of the encoder and a writer thread
+    drains encoded chunks behind it, connected by bounded queues, so the
+    disk and the CPU work at the same time. The output is identical to
+    ``encode_stream``.
+
+    Args:
+        source (BinaryIO): The binary stream to read from.
+        target (BinaryIO): The binary stream to write to.
+        chunk_size (int): The number of input bytes to encode per step.
+        source_hash: Optional hashlib object fed with every input chunk.
+        target_hash: Optional hashlib object fed with every output chunk.
+        read_ahead (int): The number of chunks each queue may hold.
+        pool (BufferPool): The pool read buffers are taken from, the
+            process-wide pool by default; pass one to keep them private.
+        codec (TextCodec): The encoding to apply.
+
+    Returns:
+        StreamStats: The byte counts and digests of both streams.
+    """
+    chunk_size = align_chunk_size(chunk_size, codec.block)
+    pool = _pipeline_pool(pool, read_ahead)
+    return _run_pipeline(source, target, _EncodeTransform(codec), pool,
+                         chunk_size, source_hash, target_hash, read_ahead)
+
+
+def pipeline_decode(source: BinaryIO, target: BinaryIO,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    source_hash: Any = None,
+                    target_hash: Any = None,
+                    read_ahead: int = DEFAULT_READ_AHEAD,
+                    pool: BufferPool = None,
+                    codec: TextCodec = BASE64) -> StreamStats:
+    """
+    Decodes the Base64 source stream with overlapped I/O.
+
+    Works like ``pipeline_encode`` around the whitespace-tolerant decoder,
+    and produces the same output as ``decode_stream``.
+
+    Args:
+        source (BinaryIO): The Base64 stream to read from.
+        target (BinaryIO): The binary stream to write to.
+        chunk_size (int): The number of input bytes to read per step.
+        source_hash: Optional hashlib object fed with every input chunk.
+        target_hash: Optional hashlib object fed with every output chunk.
+        read_ahead (int): The number of chunks each queue may hold.
+        pool (BufferPool): The pool read buffers are taken from, the
+            process-wide pool by default; pass one to keep them private.
+        codec (TextCodec): The encoding to undo.
+
+    Returns:
+        StreamStats: The byte counts and digests of both streams.
+
+    Raises:
+        binascii.Error: If the input is not valid for the codec.
+    """
+    chunk_size = align_chunk_size(chunk_size, codec.encoded_block)
+    pool = _pipeline_pool(pool, read_ahead)
+    return _run_pipeline(source, target,
+                         _DecodeTransform(pool, chunk_size, codec),
+                         pool, chunk_size, source_hash, target_hash,
+                         read_ahead)
+
+
+__all__ = [
+    "DEFAULT_READ_AHEAD",
+    "pipeline_decode",
+    "pipeline_encode",
+]
@@ -0,0 +1,193 @@
+import binascii
+import bisect
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import BinaryIO, List, Optional
+
+from .container import MAGIC
+from .registry import BASE64, TextCodec
+from .stream import ALPHABET, WHITESPACE, extract_symbols
+
+# Suffix of the sidecar index kept next to a line-wrapped Base64 file.
+INDEX_SUFFIX = ".amy.idx"
+INDEX_VERSION = 1
+
+# Raw bytes between two index checkpoints; at most this much input is
+# scanned before the first symbol of a range.
+DEFAULT_INDEX_INTERVAL = 1024 * 1024
+
+READ_SIZE = 64 * 1024
+
+
+def index_path(path: str) -> str:
+    """Returns the path of the sidecar index of a Base64 file."""
+    return f"{path}{INDEX_SUFFIX}"
+
+
+@dataclass
+class SymbolIndex:
+    """
+    Maps symbol positions of a Base64 file to byte offsets.
+
+    Checkpoint ``i`` is the raw byte offset ``i * interval`` and
+    ``symbols[i]`` the number of Base64 symbols before it. The index is
+    only valid for the file size and ``mtime_ns`` it was built from.
+    """
+    size: int
+    mtime_ns: int
+    interval: int = DEFAULT_INDEX_INTERVAL
+    symbols: List[int] = field(default_factory=list)
+    total: int = 0
+    version: int = INDEX_VERSION
+
+    @classmethod
+    def build(cls, path: str, interval: int = DEFAULT_INDEX_INTERVAL,
+              alphabet: bytes = ALPHABET) -> "SymbolIndex":
+        """
+        Scans an encoded file once and records its symbol checkpoints.
+
+        Raises:
+            binascii.Error: If the file contains symbols outside the
+                alphabet.
+        """
+        stat = os.stat(path)
+        index = cls(size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                    interval=interval)
+        with open(path, 'rb') as source:
+            while chunk := source.read(interval):
+                index.symbols.append(index.total)
+                index.total += len(extract_symbols(chunk, alphabet))
+        return index
+
+    @classmethod
+    def load(cls, path: str) -> Optional["SymbolIndex"]:
+        """Reads the sidecar index of a file if it is still valid."""
+        try:
+            with open(index_path(path), 'r', encoding='utf-8') as file:
+                index = cls(**json.load(file))
+            stat = os.stat(path)
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if index.version != INDEX_VERSION or \
+                (index.size, index.mtime_ns) != \
+                (stat.st_size, stat.st_mtime_ns):
+            return None
+        return index
+
+    def save(self, path: str) -> bool:
+        """Writes the sidecar index, returning False if it is not writable."""
+        temporary = f"{index_path(path)}.tmp"
+        try:
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(asdict(self), file)
+            os.replace(temporary, index_path(path))
+        except OSError:
+            return False
+        return True
+
+    def locate(self, symbol: int) -> tuple:
+        """Returns the checkpoint (byte offset, symbol) at or before a symbol."""
+        if not self.symbols:
+            return 0, 0
+        position = max(bisect.bisect_right(self.symbols, symbol) - 1, 0)
+        return position * self.interval, self.symbols[position]
+
+
+def get_index(path: str, alphabet: bytes = ALPHABET) -> SymbolIndex:
+    """Returns the valid sidecar index of a file, building it if needed."""
+    index = SymbolIndex.load(path)
+    if index is None:
+        index = SymbolIndex.build(path, alphabet=alphabet)
+        # Without a writable directory the index is used just this once.
+        index.save(path)
+    return index
+
+
+def _read_symbols(source: BinaryIO, skip: int, count: int,
+                  alphabet: bytes = ALPHABET) -> bytes:
+    """Reads ``count`` symbols after skipping ``skip`` from the position."""
+    symbols = bytearray()
+    while len(symbols) < skip + count:
+        chunk = source.read(READ_SIZE)
+        if not chunk:
+            break
+        symbols += extract_symbols(chunk, alphabet)
+    return bytes(symbols[skip:skip + count])
+
+
+def decode_range(path: str, offset: int, length: int,
+                 index: bool = True, codec: TextCodec = BASE64) -> bytes:
+    """
+    Decodes ``length`` bytes at ``offset`` of the data a Base64 file holds.
+
+    Only the symbol groups covering the range are read. They are located
+    through a sidecar index that is built by one scan and reused until the
+    file changes, so line-wrapped and irregular files work too. A caller
+    that knows the file is a single unbroken line, as the encoder writes
+    it, can skip the index and have the position computed directly.
+
+    Args:
+        path (str): The Base64 file.
+        offset (int): The offset into the decoded data.
+        length (int): The number of decoded bytes to return.
+        index (bool): True to locate the range through the index, False
+            to compute its position in a file known to be a single line.
+        codec (TextCodec): The encoding of the file.
+
+    Returns:
+        bytes: The decoded range, shorter than ``length`` at the end of
+            the data.
+
+    Raises:
+        ValueError: If the offset or length is negative, or the file
+            cannot be read, is not valid for the codec or, without the
+            index, is not a single line.
+    """
+    if offset < 0 or length < 0:
+        raise ValueError(
+            f"Offset and length must not be negative, got {offset}, {length}")
+    if not length:
+        return b""
+
+    first_group = offset // codec.block
+    last_group = -(-(offset + length) // codec.block)
+    start = first_group * codec.encoded_block
+    count = (last_group - first_group) * codec.encoded_block
+
+    try:
+        with open(path, 'rb') as source:
+            if source.read(len(MAGIC)) == MAGIC:
+                raise ValueError(
+                    f"'{path}' is a framed container, not plain Base64")
+            if index:
+                symbol_index = get_index(path, codec.alphabet)
+                position, before = symbol_index.locate(start)
+                source.seek(position)
+                symbols = _read_symbols(source, start - before, count,
+                                        codec.alphabet)
+            else:
+                source.seek(start)
+                symbols = source.read(count).rstrip(WHITESPACE)
+                if symbols.translate(None, codec.alphabet):
+                    raise ValueError(
+                        f"'{path}' is not a single line of encoded text, "
+                        f"decode the range through the index")
+
+        decoded = codec.decode(symbols) if symbols else b""
+    except (OSError, binascii.Error) as err:
+        raise ValueError(
+            f"Failed to decode range of '{path}': {err}") from err
+
+    skip = offset - first_group * codec.block
+    return decoded[skip:skip + length]
+
+
+__all__ = [
+    "INDEX_SUFFIX",
+    "SymbolIndex",
+    "decode_range",
+    "get_index",
+    "index_path",
+]
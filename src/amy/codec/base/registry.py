@@ -0,0 +1,153 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+BASE64_ALPHABET = (b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+                   b"0123456789+/=")
+URLSAFE_ALPHABET = BASE64_ALPHABET.translate(bytes.maketrans(b"+/", b"-_"))
+BASE32_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ234567="
+HEX_ALPHABET = b"0123456789abcdefABCDEF"
+# RFC 1924 digits in order of value, as used by ``base64.b85encode``.
+BASE85_ALPHABET = (b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+                   b"abcdefghijklmnopqrstuvwxyz!#$%&()*+-;<=>?@^_`{|}~")
+ASCII85_ALPHABET = bytes(range(ord("!"), ord("u") + 1))
+
+_TO_URLSAFE = bytes.maketrans(b"+/", b"-_")
+_FROM_URLSAFE = bytes.maketrans(b"-_", b"+/")
+_TO_ASCII85 = bytes.maketrans(BASE85_ALPHABET, ASCII85_ALPHABET)
+_FROM_ASCII85 = bytes.maketrans(ASCII85_ALPHABET, BASE85_ALPHABET)
+
+
+@dataclass(frozen=True)
+class TextCodec:
+    """
+    A binary-to-text encoding the streaming engines can run.
+
+    Every ``block`` input bytes map onto ``encoded_block`` symbols, so
+    chunks of whole groups encode independently and their outputs
+    concatenate. A final partial group is either completed with
+    ``padding`` symbols or shortened, and ``alphabet`` lists every symbol
+    that may appear in the encoded text, padding included.
+    """
+    name: str
+    block: int
+    encoded_block: int
+    alphabet: bytes
+    encode: Callable[[Any], bytes]
+    decode: Callable[[Any], bytes]
+    padding: bytes = b""
+    suffix: str = ""
+
+    def encoded_size(self, size: int) -> int:
+        """Returns the encoded length of an input of the given size."""
+        groups, rest = divmod(size, self.block)
+        if rest and self.padding:
+            return (groups + 1) * self.encoded_block
+        return groups * self.encoded_block + \
+            -(-rest * self.encoded_block // self.block)
+
+    def decoded_size(self, symbols: int) -> int:
+        """Returns the decoded length of ``symbols`` non-padding symbols."""
+        groups, rest = divmod(symbols, self.encoded_block)
+        return groups * self.block + rest * self.block // self.encoded_block
+
+    def __str__(self) -> str:
+        return f"TextCodec({self.name})"
+
+
+def _base64_encode(data: Any) -> bytes:
+    return binascii.b2a_base64(data, newline=False)
+
+
+def _urlsafe_encode(data: Any) -> bytes:
+    return binascii.b2a_base64(data, newline=False).translate(_TO_URLSAFE)
+
+
+def _urlsafe_decode(data: Any) -> bytes:
+    return binascii.a2b_base64(bytes(data).translate(_FROM_URLSAFE))
+
+
+def _base85_decode(data: Any) -> bytes:
+    try:
+        return base64.b85decode(data)
+    except ValueError as err:
+        # Report invalid input like the binascii decoders do.
+        raise binascii.Error(str(err)) from err
+
+
+def _ascii85_encode(data: Any) -> bytes:
+    return base64.b85encode(data).translate(_TO_ASCII85)
+
+
+def _ascii85_decode(data: Any) -> bytes:
+    return _base85_decode(bytes(data).translate(_FROM_ASCII85))
+
+
+CODECS: Dict[str, TextCodec] = {}
+
+
+def register_codec(codec: TextCodec) -> TextCodec:
+    """
+    Adds a codec to the registry, replacing one of the same name.
+
+    Args:
+        codec (TextCodec): The codec. Its encode and decode functions must
+            be defined at module level so worker processes can load them.
+
+    Returns:
+        TextCodec: The registered codec.
+    """
+    CODECS[codec.name] = codec
+    return codec
+
+
+def get_codec(name: str = None) -> TextCodec:
+    """
+    Returns a registered codec, Base64 when no name is given.
+
+    Raises:
+        ValueError: If no codec of that name is registered.
+    """
+    try:
+        return CODECS[name or "base64"]
+    except KeyError as err:
+        raise ValueError(f"Codec {name} not supported, expected one of "
+                         f"{', '.join(codec_names())}") from err
+
+
+def codec_names() -> List[str]:
+    """Returns the names of all registered codecs."""
+    return list(CODECS)
+
+
+BASE64 = register_codec(TextCodec(
+    "base64", 3, 4, BASE64_ALPHABET, _base64_encode, binascii.a2b_base64,
+    padding=b"=", suffix=".b64"))
+register_codec(TextCodec(
+    "urlsafe", 3, 4, URLSAFE_ALPHABET, _urlsafe_encode, _urlsafe_decode,
+    padding=b"=", suffix=".b64"))
+register_codec(TextCodec(
+    "base32", 5, 8, BASE32_ALPHABET, base64.b32encode, base64.b32decode,
+    padding=b"=", suffix=".b32"))
+register_codec(TextCodec(
+    "hex", 1, 2, HEX_ALPHABET, binascii.b2a_hex, binascii.a2b_hex,
+    suffix=".hex"))
+register_codec(TextCodec(
+    "base85", 4, 5, BASE85_ALPHABET, base64.b85encode, _base85_decode,
+    suffix=".b85"))
+# Ascii85 digits without the 'z' shorthand for zero groups, which would
+# break the fixed group width the engines rely on.
+register_codec(TextCodec(
+    "ascii85", 4, 5, ASCII85_ALPHABET, _ascii85_encode, _ascii85_decode,
+    suffix=".a85"))
+
+
+__all__ = [
+    "BASE64",
+    "CODECS",
+    "TextCodec",
+    "codec_names",
+    "get_codec",
+    "register_codec",
+]
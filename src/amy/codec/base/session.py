@@ -0,0 +1,459 @@
+import contextlib
+import hashlib
+import os
+import sys
+import time
+from time import perf_counter
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from amy.utils import (
+    STDIO_PATH, ConfigNamespace, FileInfo, FileValidator, StageProfiler,
+    get_digest_cache)
+
+from .container import (
+    COMPRESSIONS, MAGIC, MAX_HEADER_SIZE, ContainerHeader, FrameError,
+    container_decode, container_encode, is_container,
+    parallel_container_decode, read_header)
+from .manifest import Manifest, manifest_path
+from .mapped import mmap_decode, mmap_encode
+from .parallel import parallel_decode, parallel_encode, resolve_jobs
+from .patch import DEFAULT_BLOCK_SIZE, patch_encode
+from .pipeline import DEFAULT_READ_AHEAD, pipeline_decode, pipeline_encode
+from .registry import BASE64, TextCodec, get_codec
+from .stream import (
+    DEFAULT_CHUNK_SIZE, StreamStats, decode_stream, encode_stream)
+
+ENGINES = ("stream", "pipeline", "mmap")
+
+
+@contextlib.contextmanager
+def _open_stdio(mode: str) -> Iterator[BinaryIO]:
+    """Yields the binary stdin or stdout without closing it."""
+    if 'r' in mode:
+        yield sys.stdin.buffer
+        return
+    try:
+        yield sys.stdout.buffer
+    finally:
+        sys.stdout.buffer.flush()
+
+
+class CodecSession:
+    """
+    Holds the state of a single encode or decode job.
+
+    Everything a job needs (environment, mode, file paths and engine
+    options) lives on the instance, so any number of sessions can run
+    concurrently in one process, for example from a thread pool.
+
+    Every job records its read, transform, write and hash times plus the
+    end-to-end "total" on the session's profiler.
+
+    In incremental mode a manifest is written next to the output, and a
+    later job whose input and output still match it is skipped. Encodes
+    of a changed input only rewrite the output ranges of changed blocks.
+
+    The text encoding is taken from the codec registry by name, Base64 by
+    default, and runs through every engine. A compression other than
+    "none" compresses every frame of a container before it is encoded;
+    decoding reads both from the container header.
+
+    The input path "-" reads standard input and the output path "-" writes
+    standard output, streamed in constant memory. Such jobs run on the
+    stream or pipeline engine in this process.
+    """
+
+    environment: ConfigNamespace = None
+    file: FileInfo = None
+    mode: str = None
+    codec: TextCodec = BASE64
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    jobs: int = 1
+    engine: str = "stream"
+    read_ahead: int = DEFAULT_READ_AHEAD
+    profiler: StageProfiler = None
+    seconds: float = None
+    incremental: bool = False
+    container: bool = False
+    compression: str = "none"
+    skipped: bool = False
+    patched_bytes: int = None
+
+    def __init__(self, environment: ConfigNamespace,
+                 profiler: StageProfiler = None):
+        if not environment:
+            raise ValueError("Environment variables are not set.")
+
+        self.profiler = profiler or StageProfiler()
+
+        self.environment = environment
+        self.mode = environment.mode
+        self.codec = get_codec(getattr(environment, "codec", None))
+        # Each engine aligns the size to the group of its direction and
+        # codec, which for a container input is only known from its header.
+        self.chunk_size = getattr(
+            environment, "chunk_size", None) or DEFAULT_CHUNK_SIZE
+        if self.chunk_size < 1:
+            raise ValueError(
+                f"Chunk size must be positive, got {self.chunk_size}")
+        self.jobs = resolve_jobs(getattr(environment, "jobs", 1))
+        self.engine = getattr(environment, "engine", None) or "stream"
+        self.read_ahead = getattr(
+            environment, "read_ahead", None) or DEFAULT_READ_AHEAD
+        self.incremental = bool(getattr(environment, "incremental", False))
+        self.compression = getattr(
+            environment, "compression", None) or "none"
+        # Only a container records the compression for the decoder.
+        self.container = bool(getattr(environment, "container", False)) or \
+            self.compression != "none"
+
+        if self.engine not in ENGINES:
+            raise ValueError(f"Engine {self.engine} not supported.")
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Compression {self.compression} not supported.")
+
+        input_file = environment.file
+        output_file = getattr(environment, "output", None)
+
+        if input_file != STDIO_PATH:
+            FileValidator.validate_file(input_file)
+
+        if not output_file and input_file == STDIO_PATH:
+            output_file = STDIO_PATH
+        output_file = output_file if output_file else self._get_file_path(
+            file=input_file, mode=self.mode,
+            suffix=self._encoded_suffix(input_file))
+
+        self.file = FileInfo(
+            input_path=input_file,
+            output_path=output_file,
+            cache=self._get_cache(environment)
+        )
+
+        if self.streaming:
+            if self.incremental:
+                raise ValueError(
+                    "Incremental mode needs files, not standard input "
+                    "or output.")
+            # Worker processes and memory maps need regular files.
+            self.jobs = 1
+            if self.engine == "mmap":
+                self.engine = "stream"
+
+    @property
+    def streaming(self) -> bool:
+        """Returns True if the job reads stdin or writes stdout."""
+        return STDIO_PATH in (self.file.input_path, self.file.output_path)
+
+    @staticmethod
+    def _get_cache(environment: ConfigNamespace):
+        """Returns the digest cache selected by the environment, if any."""
+        if getattr(environment, "digest_cache", True) is False:
+            return None
+        return get_digest_cache(getattr(environment, "cache_dir", None))
+
+    def _encoded_suffix(self, input_file: str) -> str:
+        """
+        Returns the suffix of the encoded file, which for a container
+        being decoded is that of the codec named in its header.
+        """
+        if self.mode == "decode" and is_container(input_file):
+            with self._open_file(input_file, 'rb') as source:
+                header, _ = read_header(source)
+            return get_codec(header.codec).suffix
+        return self.codec.suffix
+
+    @staticmethod
+    def _get_file_path(file: str, mode="", suffix: str = ".b64"):
+        """
+        Derives the output path from the input path and the mode.
+
+        Raises:
+            ValueError: If the mode is not supported, or a decoded input
+                does not end in the suffix that would be removed.
+        """
+
+        if mode == "encode":
+            return f"{file}{suffix}"
+
+        if mode != "decode":
+            raise ValueError(f"Mode {mode} not supported.")
+
+        if file.endswith(suffix):
+            return file[:-len(suffix)]
+
+        raise ValueError(
+            f"Cannot derive the output path of '{file}': expected the "
+            f"suffix '{suffix}', or pass an output path")
+
+    def process(self, encoding: bool) -> FileInfo:
+        """
+        Transforms the file without logging, raising on failure.
+
+        Returns the FileInfo with the recorded sizes and digests.
+        """
+        started = perf_counter()
+        if not encoding:
+            self._detect_container()
+        manifest = self._load_manifest() if self.incremental else None
+        if manifest is not None and self._is_current(manifest):
+            self.skipped = True
+            self.seconds = perf_counter() - started
+            self.profiler.record("skip", self.seconds)
+            return self.file
+
+        # Taken before the transform, so an input that changes meanwhile
+        # is not cached or recorded as current under its new identity.
+        input_stat = None
+        if self.file.input_path != STDIO_PATH:
+            try:
+                input_stat = os.stat(self.file.input_path)
+            except OSError as err:
+                raise ValueError(f"Failed to open file "
+                                 f"'{self.file.input_path}': {err}") from err
+        blocks = None
+        if self.incremental and encoding and not self.container:
+            stats, blocks = self._patch(manifest)
+        else:
+            stats = self._transform(encoding=encoding)
+        self.seconds = perf_counter() - started
+
+        if blocks is None:
+            self.file.record(stats.bytes_read, stats.bytes_written,
+                             stats.input_hash, stats.output_hash,
+                             input_stat)
+            if self.compression != "none":
+                original = stats.bytes_read if encoding else \
+                    stats.bytes_written
+                self.file.compression = self.compression
+                self.file.compressed_size = stats.compressed_bytes
+                self.file.compression_ratio = \
+                    original / stats.compressed_bytes \
+                    if stats.compressed_bytes else None
+        else:
+            # Only the patched ranges were written and hashed.
+            self.patched_bytes = stats.bytes_written
+            self.file.record(stats.bytes_read,
+                             self.codec.encoded_size(stats.bytes_read),
+                             stats.input_hash, input_stat=input_stat)
+        self.profiler.record_stats(stats)
+        self.profiler.record("total", self.seconds, stats.bytes_read)
+
+        if self.incremental:
+            self._write_manifest(input_stat, blocks)
+        return self.file
+
+    @property
+    def parameters(self) -> dict:
+        """Returns the options that determine the output bytes."""
+        return {"mode": self.mode, "codec": self.codec.name,
+                "container": self.container,
+                "compression": self.compression}
+
+    def _detect_container(self) -> None:
+        """
+        Takes the codec and compression of a container input from its
+        header, so they are known before the manifest is compared.
+        """
+        if self.file.input_path == STDIO_PATH:
+            # Peek without consuming; a pipe's first read normally holds
+            # the whole header line.
+            head = sys.stdin.buffer.peek(MAX_HEADER_SIZE)
+            if not head.startswith(MAGIC):
+                return
+            self.container = True
+            try:
+                header = ContainerHeader.parse(
+                    head.partition(b"\n")[0] + b"\n")
+            except FrameError:
+                # Left to container_decode, which reads the whole line.
+                return
+        elif is_container(self.file.input_path):
+            self.container = True
+            with self._open_file(self.file.input_path, 'rb') as source:
+                header, _ = read_header(source)
+        else:
+            return
+        self.codec = get_codec(header.codec)
+        self.compression = header.compression
+
+    def _load_manifest(self) -> Optional[Manifest]:
+        """Returns the manifest of the output, if it has one."""
+        return Manifest.load(manifest_path(self.file.output_path))
+
+    def _is_current(self, manifest: Manifest) -> bool:
+        """
+        Checks the output's manifest against the current input.
+
+        On a match the sizes and digests from the manifest are recorded,
+        so the job reports them without touching either file.
+        """
+        if not manifest.matches(self.file.input_path, self.file.output_path,
+                                self.parameters, self.file.digest):
+            return False
+
+        self.file.record(manifest.input_size, manifest.output_size,
+                         manifest.input_hash, manifest.output_hash)
+        return True
+
+    def _patch(self, manifest: Optional[Manifest]) -> Tuple[StreamStats, list]:
+        """
+        Encodes only the blocks that changed since the manifest was written.
+
+        The previous block digests are only trusted while the output is
+        untouched; otherwise every block is encoded again.
+        """
+        blocks = []
+        if manifest is not None and \
+                manifest.block_size == DEFAULT_BLOCK_SIZE and \
+                manifest.output_intact(self.file.output_path,
+                                       self.parameters):
+            blocks = manifest.blocks
+
+        return patch_encode(self.file.input_path, self.file.output_path,
+                            blocks=blocks, block_size=DEFAULT_BLOCK_SIZE,
+                            source_hash=hashlib.sha256(), codec=self.codec)
+
+    def _write_manifest(self, input_stat: os.stat_result,
+                        blocks: list = None) -> None:
+        """Records the input the output was just produced from."""
+        input_hash, output_hash = self.file.sha256_hash()
+        self.file.input_hash, self.file.output_hash = input_hash, output_hash
+        output_stat = os.stat(self.file.output_path)
+        Manifest(
+            input_path=self.file.input_path,
+            input_size=input_stat.st_size,
+            input_mtime_ns=input_stat.st_mtime_ns,
+            input_hash=input_hash,
+            output_size=output_stat.st_size,
+            output_mtime_ns=output_stat.st_mtime_ns,
+            output_hash=output_hash,
+            parameters=self.parameters,
+            block_size=DEFAULT_BLOCK_SIZE if blocks is not None else 0,
+            blocks=blocks or [],
+        ).save(manifest_path(self.file.output_path))
+
+    def metrics(self) -> dict:
+        """
+        Returns the metrics of the last processed job.
+
+        The record holds the paths, sizes and digests of both files, the
+        engine and worker count, the wall-clock duration and throughput,
+        and the time spent in each stage.
+        """
+        if self.seconds is None:
+            raise ValueError("No job has been processed.")
+
+        seconds = self.seconds
+        rate = self.file.input_size / seconds if seconds else 0.0
+        return {
+            "timestamp": time.time(),
+            "mode": self.mode,
+            "codec": self.codec.name,
+            "engine": "parallel" if self.jobs > 1 else self.engine,
+            "container": self.container,
+            "compression": self.compression,
+            "compressed_size": self.file.compressed_size,
+            "compression_ratio": self.file.compression_ratio,
+            "jobs": self.jobs,
+            "chunk_size": self.chunk_size,
+            "input_path": self.file.input_path,
+            "output_path": self.file.output_path,
+            "input_size": self.file.input_size,
+            "output_size": self.file.output_size,
+            "input_hash": self.file.input_hash,
+            "output_hash": self.file.output_hash,
+            "skipped": self.skipped,
+            "patched_bytes": self.patched_bytes,
+            "seconds": seconds,
+            "bytes_per_second": rate,
+            "stages": {timing.name: timing.seconds
+                       for timing in self.profiler.stages},
+        }
+
+    def _transform(self, encoding: bool) -> StreamStats:
+        """Runs the engine selected by the environment on the file paths."""
+        input_path = self.file.input_path
+        output_path = self.file.output_path
+
+        if self.container:
+            return self._transform_container(encoding=encoding)
+
+        if self.jobs > 1:
+            # Transform aligned segments in worker processes
+            engine = parallel_encode if encoding else parallel_decode
+            return engine(input_path, output_path,
+                          jobs=self.jobs, chunk_size=self.chunk_size,
+                          codec=self.codec)
+
+        if self.engine == "mmap":
+            # Transform directly between memory mappings
+            engine = mmap_encode if encoding else mmap_decode
+            return engine(input_path, output_path,
+                          chunk_size=self.chunk_size,
+                          source_hash=hashlib.sha256(),
+                          target_hash=hashlib.sha256(),
+                          codec=self.codec)
+
+        with self._open_file(input_path, 'rb') as source, \
+                self._open_file(output_path, 'wb') as target:
+            if self.engine == "pipeline":
+                # Overlap reading, transforming and writing
+                engine = pipeline_encode if encoding else pipeline_decode
+                return engine(source, target, chunk_size=self.chunk_size,
+                              source_hash=hashlib.sha256(),
+                              target_hash=hashlib.sha256(),
+                              read_ahead=self.read_ahead,
+                              codec=self.codec)
+
+            # Transform chunk by chunk
+            engine = encode_stream if encoding else decode_stream
+            return engine(source, target, chunk_size=self.chunk_size,
+                          source_hash=hashlib.sha256(),
+                          target_hash=hashlib.sha256(),
+                          codec=self.codec)
+
+    def _transform_container(self, encoding: bool) -> StreamStats:
+        """Writes or reads a framed container, verifying every frame."""
+        input_path = self.file.input_path
+        output_path = self.file.output_path
+
+        if not encoding and self.jobs > 1:
+            # Decode and verify frames in worker processes
+            return parallel_container_decode(input_path, output_path,
+                                             jobs=self.jobs)
+
+        with self._open_file(input_path, 'rb') as source, \
+                self._open_file(output_path, 'wb') as target:
+            if encoding:
+                return container_encode(source, target,
+                                        source_hash=hashlib.sha256(),
+                                        compression=self.compression,
+                                        codec=self.codec.name)
+            return container_decode(source, target,
+                                    source_hash=hashlib.sha256(),
+                                    target_hash=hashlib.sha256())
+
+    @staticmethod
+    def _open_file(file_path: str, mode: str = 'rb') -> BinaryIO:
+        """Opens the specified file in binary mode, "-" for stdin/stdout."""
+        if file_path == STDIO_PATH:
+            return _open_stdio(mode)
+        try:
+            return open(file_path, mode)  # pylint: disable=consider-using-with
+        except OSError as err:
+            raise ValueError(
+                f"Failed to open file '{file_path}': {err}") from err
+
+    def __str__(self) -> str:
+        return f"CodecSession({self.mode}: {self.file})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+__all__ = [
+    "ENGINES",
+    "CodecSession",
+]
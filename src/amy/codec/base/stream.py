@@ -0,0 +1,334 @@
+import binascii
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, BinaryIO, Iterable
+
+from .buffers import BufferPool, default_pool
+from .registry import BASE64, TextCodec
+
+# Base64 maps every 3 input bytes onto 4 output symbols, so chunks that are
+# a multiple of 3 bytes can be encoded independently and concatenated.
+# Other codecs describe their groups on their TextCodec.
+ENCODE_BLOCK = BASE64.block
+ENCODED_BLOCK = BASE64.encoded_block
+
+DEFAULT_CHUNK_SIZE = 3 * 1024 * 1024
+
+# Line wrapping (MIME, PEM) and CRLF conversion only ever add whitespace,
+# which is skipped while decoding.
+WHITESPACE = b" \t\r\n\v\f"
+ALPHABET = BASE64.alphabet
+
+
+@dataclass
+class StreamStats:
+    """Sizes and digests gathered while a stream was transformed."""
+    bytes_read: int = 0
+    bytes_written: int = 0
+    input_hash: str = None
+    output_hash: str = None
+    chunks: int = 0
+    # Buffers the pool had to create, 0 once it is warm. Not a count of
+    # all allocations: every encoded or decoded chunk and the symbols
+    # extracted from it are still new bytes objects.
+    pool_misses: int = 0
+    read_seconds: float = 0.0
+    transform_seconds: float = 0.0
+    write_seconds: float = 0.0
+    hash_seconds: float = 0.0
+    # Compressed bytes of a container, before Base64 or after it is undone.
+    compressed_bytes: int = 0
+
+    @classmethod
+    def combine(cls, results: Iterable["StreamStats"]) -> "StreamStats":
+        """Sums the counts and stage times of independent segments."""
+        total = cls()
+        for result in results:
+            total.bytes_read += result.bytes_read
+            total.bytes_written += result.bytes_written
+            total.chunks += result.chunks
+            total.pool_misses += result.pool_misses
+            total.read_seconds += result.read_seconds
+            total.transform_seconds += result.transform_seconds
+            total.write_seconds += result.write_seconds
+            total.hash_seconds += result.hash_seconds
+            total.compressed_bytes += result.compressed_bytes
+        return total
+
+
+def align_chunk_size(chunk_size: int, block: int = ENCODE_BLOCK) -> int:
+    """Rounds the chunk size down to a multiple of the block size."""
+    if chunk_size is None:
+        return DEFAULT_CHUNK_SIZE
+    if chunk_size < block:
+        raise ValueError(
+            f"Chunk size must be at least {block} bytes, got {chunk_size}.")
+    return chunk_size - (chunk_size % block)
+
+
+def encoded_size(size: int, codec: TextCodec = BASE64) -> int:
+    """Returns the encoded length of an input of the given size."""
+    return codec.encoded_size(size)
+
+
+def extract_symbols(chunk: bytes, alphabet: bytes = ALPHABET) -> bytes:
+    """
+    Removes whitespace from a chunk of encoded input.
+
+    Raises:
+        binascii.Error: If the chunk contains symbols outside the alphabet.
+    """
+    symbols = chunk.translate(None, WHITESPACE)
+    if symbols.translate(None, alphabet):
+        raise binascii.Error("Non-base64 digit found" if alphabet is ALPHABET
+                             else "Symbol outside the codec alphabet found")
+    return symbols
+
+
+def check_padding(symbols: Any, end: int, codec: TextCodec = BASE64,
+                  padded: bool = False) -> bool:
+    """
+    Rejects padding anywhere but at the end of the final group.
+
+    The binascii decoders stop at the first padding symbol and drop the
+    rest of the slice they are given, so without this check the output
+    would depend on where chunk boundaries fall.
+
+    Args:
+        symbols: The staged symbols, a bytes or bytearray.
+        end (int): The number of symbols about to be decoded.
+        codec (TextCodec): The encoding being undone.
+        padded (bool): Whether earlier symbols already ended with padding.
+
+    Returns:
+        bool: Whether the input decoded so far ends with padding.
+
+    Raises:
+        binascii.Error: If symbols follow a padding symbol.
+    """
+    if not codec.padding or not end:
+        return padded
+    if padded:
+        raise binascii.Error("Padding found before the end of the input")
+    first = symbols.find(codec.padding, 0, end)
+    if first == -1:
+        return False
+    if first < end - codec.encoded_block or \
+            symbols[first:end].strip(codec.padding):
+        raise binascii.Error("Padding found before the end of the input")
+    return True
+
+
+def _hexdigest(hasher: Any) -> str:
+    """Returns the hex digest of an optional hasher."""
+    return hasher.hexdigest() if hasher is not None else None
+
+
+def _next_read(size: int, stats: StreamStats, limit: int) -> int:
+    """Returns how many bytes to read next without overrunning the limit."""
+    if limit is None:
+        return size
+    return min(size, limit - stats.bytes_read)
+
+
+def _digest(hasher: Any, data: bytes, stats: StreamStats) -> None:
+    """Feeds a chunk to an optional hasher and times it."""
+    if hasher is not None:
+        started = perf_counter()
+        hasher.update(data)
+        stats.hash_seconds += perf_counter() - started
+
+
+def _emit(target: BinaryIO, data: bytes, stats: StreamStats,
+          target_hash: Any) -> None:
+    """Writes a transformed chunk and accounts for it."""
+    started = perf_counter()
+    target.write(data)
+    stats.write_seconds += perf_counter() - started
+    stats.bytes_written += len(data)
+    _digest(target_hash, data, stats)
+
+
+def encode_stream(source: BinaryIO, target: BinaryIO,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  source_hash: Any = None,
+                  target_hash: Any = None,
+                  limit: int = None,
+                  pool: BufferPool = None,
+                  codec: TextCodec = BASE64) -> StreamStats:
+    """
+    Encodes the source stream to Base64 and writes it to the target stream.
+
+    Only one chunk of input and its encoded form are held in memory at a
+    time, and the output is byte-identical to ``base64.b64encode``, or to
+    encoding the whole input at once with another codec. Input is read
+    with ``readinto`` into a pooled buffer, so a warm loop creates no
+    input buffers; each encoded chunk is still a new bytes object.
+
+    Args:
+        source (BinaryIO): The binary stream to read from.
+        target (BinaryIO): The binary stream to write to.
+        chunk_size (int): The number of input bytes to encode per step.
+        source_hash: Optional hashlib object fed with every input chunk.
+        target_hash: Optional hashlib object fed with every output chunk.
+        limit (int): Optional number of bytes to read from the source
+            before stopping, used to transform a segment of a file.
+        pool (BufferPool): The pool chunk buffers are taken from,
+            the process-wide pool by default.
+        codec (TextCodec): The encoding to apply.
+
+    Returns:
+        StreamStats: The byte counts and digests of both streams.
+    """
+    chunk_size = align_chunk_size(chunk_size, codec.block)
+    pool = pool or default_pool
+    misses = pool.misses
+    stats = StreamStats()
+
+    buffer = pool.acquire(chunk_size)
+    view = memoryview(buffer)
+    pending = 0
+
+    try:
+        while True:
+            size = _next_read(chunk_size - pending, stats, limit)
+            started = perf_counter()
+            count = source.readinto(view[pending:pending + size]) if size else 0
+            stats.read_seconds += perf_counter() - started
+            if not count:
+                break
+
+            stats.chunks += 1
+            stats.bytes_read += count
+            _digest(source_hash, view[pending:pending + count], stats)
+
+            # Encode whole groups and move the remainder to the front.
+            started = perf_counter()
+            filled = pending + count
+            cut = filled - (filled % codec.block)
+            encoded = codec.encode(view[:cut])
+            pending = filled - cut
+            view[:pending] = view[cut:filled]
+            stats.transform_seconds += perf_counter() - started
+
+            if encoded:
+                _emit(target, encoded, stats, target_hash)
+
+        if pending:
+            _emit(target, codec.encode(view[:pending]), stats, target_hash)
+    finally:
+        view.release()
+        pool.release(buffer)
+
+    stats.pool_misses = pool.misses - misses
+    stats.input_hash = _hexdigest(source_hash)
+    stats.output_hash = _hexdigest(target_hash)
+    return stats
+
+
+def decode_stream(source: BinaryIO, target: BinaryIO,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  source_hash: Any = None,
+                  target_hash: Any = None,
+                  limit: int = None,
+                  pool: BufferPool = None,
+                  codec: TextCodec = BASE64) -> StreamStats:
+    """
+    Decodes the Base64 source stream and writes the result to the target.
+
+    Whitespace is dropped as each chunk is read, and symbols that do not
+    fill a complete group (4 symbols for Base64) are carried over to the
+    next chunk, so wrapped or CRLF-converted input decodes in constant
+    memory. The read and staging buffers come from a pool and are reused
+    across chunks.
+
+    Args:
+        source (BinaryIO): The Base64 stream to read from.
+        target (BinaryIO): The binary stream to write to.
+        chunk_size (int): The number of input bytes to read per step.
+        source_hash: Optional hashlib object fed with every input chunk.
+        target_hash: Optional hashlib object fed with every output chunk.
+        limit (int): Optional number of bytes to read from the source
+            before stopping, used to transform a segment of a file.
+        pool (BufferPool): The pool chunk buffers are taken from,
+            the process-wide pool by default.
+        codec (TextCodec): The encoding to undo.
+
+    Returns:
+        StreamStats: The byte counts and digests of both streams.
+
+    Raises:
+        binascii.Error: If the input contains symbols outside the codec's
+            alphabet, has incorrect padding or symbols after padding.
+    """
+    chunk_size = align_chunk_size(chunk_size, codec.encoded_block)
+    pool = pool or default_pool
+    misses = pool.misses
+    stats = StreamStats()
+
+    buffer = pool.acquire(chunk_size)
+    staging = pool.acquire(chunk_size + codec.encoded_block)
+    view = memoryview(buffer)
+    staged = memoryview(staging)
+    pending = 0
+    padded = False
+
+    try:
+        while True:
+            size = _next_read(chunk_size, stats, limit)
+            started = perf_counter()
+            count = source.readinto(view[:size]) if size else 0
+            stats.read_seconds += perf_counter() - started
+            if not count:
+                break
+
+            stats.chunks += 1
+            stats.bytes_read += count
+            _digest(source_hash, view[:count], stats)
+
+            # Only a short final read needs a copy to translate.
+            started = perf_counter()
+            symbols = extract_symbols(
+                buffer if count == chunk_size else view[:count].tobytes(),
+                codec.alphabet)
+
+            # Append the symbols to the carried ones and decode whole groups.
+            filled = pending + len(symbols)
+            staged[pending:filled] = symbols
+            cut = filled - (filled % codec.encoded_block)
+            padded = check_padding(staging, cut, codec, padded)
+            decoded = codec.decode(staged[:cut])
+            pending = filled - cut
+            staged[:pending] = staged[cut:filled]
+            stats.transform_seconds += perf_counter() - started
+
+            if decoded:
+                _emit(target, decoded, stats, target_hash)
+
+        if pending:
+            # An incomplete trailing group is reported as incorrect padding
+            # unless the codec shortens its final group.
+            check_padding(staging, pending, codec, padded)
+            _emit(target, codec.decode(staged[:pending]), stats, target_hash)
+    finally:
+        view.release()
+        staged.release()
+        pool.release(buffer)
+        pool.release(staging)
+
+    stats.pool_misses = pool.misses - misses
+    stats.input_hash = _hexdigest(source_hash)
+    stats.output_hash = _hexdigest(target_hash)
+    return stats
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "StreamStats",
+    "align_chunk_size",
+    "check_padding",
+    "decode_stream",
+    "encode_stream",
+    "encoded_size",
+    "extract_symbols",
+]
@@ -0,0 +1,176 @@
+import binascii
+import hashlib
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Any, BinaryIO, Optional, Union
+
+from .container import MAGIC, container_decode, is_container
+from .registry import get_codec
+from .stream import DEFAULT_CHUNK_SIZE, decode_stream
+
+# Bytes compared at a time while locating the first differing byte.
+_SCAN_SIZE = 4096
+
+
+@dataclass
+class VerifyResult:
+    """
+    The outcome of checking an encoded file against its original.
+
+    ``size`` counts the decoded bytes that matched the original. On a
+    mismatch, ``mismatch_offset`` is the first differing byte, which is
+    also where the shorter stream ended if their lengths differ.
+    """
+    original_path: str
+    encoded_path: str
+    match: bool
+    size: int = 0
+    mismatch_offset: Optional[int] = None
+    sha256: str = None
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Converts the result to a dictionary."""
+        return asdict(self)
+
+
+class _Mismatch(Exception):
+    """Stops decoding at the first byte that differs from the original."""
+
+    def __init__(self, offset: int):
+        super().__init__(offset)
+        self.offset = offset
+
+
+def _first_difference(expected: bytes, actual: bytes) -> int:
+    """Returns the index of the first byte in which two chunks differ."""
+    limit = min(len(expected), len(actual))
+    for start in range(0, limit, _SCAN_SIZE):
+        left = expected[start:start + _SCAN_SIZE]
+        right = actual[start:start + _SCAN_SIZE]
+        if left != right:
+            return start + next((index for index, (a, b) in
+                                 enumerate(zip(left, right)) if a != b),
+                                min(len(left), len(right)))
+    return limit
+
+
+def _read_exact(source: BinaryIO, size: int) -> bytes:
+    """Reads ``size`` bytes, fewer only at the end of the stream."""
+    data = source.read(size)
+    while data and len(data) < size:
+        more = source.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+class _CompareSink:
+    """A write target that compares decoded chunks with the original."""
+
+    def __init__(self, original: BinaryIO):
+        self.offset = 0
+        self._original = original
+
+    def write(self, data: Any) -> int:
+        """Reads as many original bytes and raises _Mismatch if they differ."""
+        expected = _read_exact(self._original, len(data))
+        if expected != data:
+            raise _Mismatch(self.offset + _first_difference(expected, data))
+        self.offset += len(data)
+        return len(data)
+
+
+def _open(file: Union[str, BinaryIO]) -> BinaryIO:
+    """Opens a path for reading; file objects are returned as they are."""
+    if not isinstance(file, str):
+        return file
+    try:
+        return open(file, 'rb')  # pylint: disable=consider-using-with
+    except OSError as err:
+        raise ValueError(f"Failed to open file '{file}': {err}") from err
+
+
+def _starts_with_magic(file: Union[str, BinaryIO], source: BinaryIO) -> bool:
+    """Checks for a container without consuming any input."""
+    if isinstance(file, str):
+        return is_container(file)
+    peek = getattr(source, "peek", None)
+    return peek is not None and peek(len(MAGIC)).startswith(MAGIC)
+
+
+def verify(original: Union[str, BinaryIO], encoded: Union[str, BinaryIO],
+           codec: str = "base64",
+           chunk_size: int = DEFAULT_CHUNK_SIZE) -> VerifyResult:
+    """
+    Checks that an encoded file decodes to the original, writing nothing.
+
+    The encoded file is decoded chunk by chunk and every decoded chunk is
+    compared with the same range of the original as it is produced, so
+    both are read once and at most one chunk of each is in memory. The
+    comparison stops at the first chunk that differs. Framed containers
+    are detected and decoded with their per-frame checks.
+
+    Args:
+        original (Union[str, BinaryIO]): The original path or binary
+            stream.
+        encoded (Union[str, BinaryIO]): The encoded path or binary stream.
+        codec (str): The name of the codec of a plain encoded file;
+            containers name their own.
+        chunk_size (int): The number of encoded bytes decoded per step.
+
+    Returns:
+        VerifyResult: The match, the bytes compared, the offset of the
+            first difference and, on a match, the SHA-256 of the data.
+
+    Raises:
+        ValueError: If a file cannot be opened, or the encoded file is not
+            valid for its codec or is a corrupt container.
+    """
+    started = perf_counter()
+    text_codec = get_codec(codec)
+    original_path = original if isinstance(original, str) else "<stream>"
+    encoded_path = encoded if isinstance(encoded, str) else "<stream>"
+
+    source = _open(encoded)
+    try:
+        reference = _open(original)
+        try:
+            sink = _CompareSink(reference)
+            target_hash = hashlib.sha256()
+            try:
+                if _starts_with_magic(encoded, source):
+                    container_decode(source, sink, target_hash=target_hash)
+                else:
+                    decode_stream(source, sink, chunk_size=chunk_size,
+                                  target_hash=target_hash, codec=text_codec)
+            except _Mismatch as mismatch:
+                return VerifyResult(original_path, encoded_path, False,
+                                    size=mismatch.offset,
+                                    mismatch_offset=mismatch.offset,
+                                    seconds=perf_counter() - started)
+            except binascii.Error as err:
+                raise ValueError(
+                    f"Failed to decode '{encoded_path}': {err}") from err
+
+            # The original must end where the decoded data ends.
+            match = not reference.read(1)
+        finally:
+            if reference is not original:
+                reference.close()
+    finally:
+        if source is not encoded:
+            source.close()
+
+    return VerifyResult(original_path, encoded_path, match,
+                        size=sink.offset,
+                        mismatch_offset=None if match else sink.offset,
+                        sha256=target_hash.hexdigest() if match else None,
+                        seconds=perf_counter() - started)
+
+
+__all__ = [
+    "VerifyResult",
+    "verify",
+]
@@ -0,0 +1,215 @@
+import io
+from typing import Any, BinaryIO, Union
+
+from .buffers import BufferPool, default_pool
+from .pipeline import _DecodeTransform, _EncodeTransform
+from .registry import get_codec
+
+# Raw bytes read or handed on per step. Smaller than the file engines'
+# chunks, so the first bytes reach a streaming consumer quickly.
+DEFAULT_WRAPPER_CHUNK_SIZE = 3 * 64 * 1024
+
+MODES = ("encode", "decode")
+
+
+def _check_mode(mode: str) -> None:
+    """Raises ValueError unless the mode is "encode" or "decode"."""
+    if mode not in MODES:
+        raise ValueError(
+            f"Mode {mode} not supported, expected 'encode' or 'decode'")
+
+
+def _make_transform(mode: str, codec: str, pool: BufferPool,
+                    chunk_size: int) -> Any:
+    """Returns the group-carrying transform of a mode."""
+    _check_mode(mode)
+    text_codec = get_codec(codec)
+    if mode == "encode":
+        return _EncodeTransform(text_codec)
+    return _DecodeTransform(pool, chunk_size, text_codec)
+
+
+class _CodecIO(io.RawIOBase):
+    """Shared state of the lazy reader and writer."""
+
+    def __init__(self, raw: BinaryIO, mode: str, codec: str,
+                 chunk_size: int, closefd: bool):
+        super().__init__()
+        self.codec_mode = mode
+        self.codec = codec
+        self._raw = raw
+        self._closefd = closefd
+        self._pool = default_pool
+        self._chunk_size = chunk_size
+        self._transform = _make_transform(mode, codec, self._pool,
+                                          chunk_size)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._finish()
+        finally:
+            try:
+                # Flushes the underlying stream while it is still open.
+                super().close()
+            finally:
+                self._transform.close()
+                if self._closefd:
+                    self._raw.close()
+
+    def _finish(self) -> None:
+        """Completes the transform before the wrapper is closed."""
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.codec_mode}, {self.codec})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class CodecReader(_CodecIO):
+    """
+    Transforms a binary stream lazily as the caller reads from it.
+
+    Every refill reads at most ``chunk_size`` bytes from the underlying
+    stream and transforms the complete groups among them; partial groups
+    are carried to the next refill, so memory stays bounded by one chunk
+    and its transformed form.
+    """
+
+    def __init__(self, raw: BinaryIO, mode: str = "encode",
+                 codec: str = "base64",
+                 chunk_size: int = DEFAULT_WRAPPER_CHUNK_SIZE,
+                 closefd: bool = True):
+        super().__init__(raw, mode, codec, chunk_size, closefd)
+        self._buffer = self._pool.acquire(chunk_size)
+        self._ready = bytearray()
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        """
+        Fills ``b`` with transformed bytes, returning 0 only at the end.
+
+        Raises:
+            binascii.Error: If decoding input that is not valid for the
+                codec.
+        """
+        while not self._ready and not self._eof:
+            count = self._raw.readinto(self._buffer)
+            if count:
+                parts = self._transform.feed(self._buffer, count)
+            else:
+                self._eof = True
+                parts = self._transform.flush()
+            for part in parts:
+                self._ready += part
+
+        with memoryview(b) as view, view.cast("B") as target:
+            count = min(len(target), len(self._ready))
+            target[:count] = self._ready[:count]
+        # Dropping the front of a bytearray does not move the rest.
+        del self._ready[:count]
+        return count
+
+    def _finish(self) -> None:
+        self._pool.release(self._buffer)
+
+
+class CodecWriter(_CodecIO):
+    """
+    Transforms bytes lazily as the caller writes them.
+
+    Written bytes are transformed in steps of at most ``chunk_size`` and
+    handed on to the underlying stream at once; only a partial group is
+    held back. Closing the writer transforms that group, which for
+    encoding adds the padding, so the writer must be closed.
+    """
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        """
+        Transforms and writes all of ``b``, returning its length.
+
+        Raises:
+            binascii.Error: If decoding input that is not valid for the
+                codec.
+        """
+        with memoryview(b) as view, view.cast("B") as data:
+            size = len(data)
+            for offset in range(0, size, self._chunk_size):
+                chunk = data[offset:offset + self._chunk_size].tobytes()
+                for part in self._transform.feed(chunk, len(chunk)):
+                    self._raw.write(part)
+        return size
+
+    def flush(self) -> None:
+        if not self.closed:
+            self._raw.flush()
+        super().flush()
+
+    def _finish(self) -> None:
+        for part in self._transform.flush():
+            self._raw.write(part)
+        self._raw.flush()
+
+
+def open(file: Union[str, BinaryIO],  # pylint: disable=redefined-builtin
+         mode: str = "encode", access: str = "r", codec: str = "base64",
+         chunk_size: int = DEFAULT_WRAPPER_CHUNK_SIZE) -> io.RawIOBase:
+    """
+    Opens a path or binary file object for lazy encoding or decoding.
+
+    With ``access`` "r", reading from the returned object yields the
+    transformed content of ``file``; with "w", bytes written to it are
+    transformed into ``file``. Either way data is processed a chunk at a
+    time, so the result can be handed to ``shutil.copyfileobj``, HTTP
+    clients and other streaming consumers. Wrap it in
+    ``io.BufferedReader`` for line or peek access.
+
+    Args:
+        file (Union[str, BinaryIO]): A path, opened and closed by the
+            wrapper, or a binary file object, which is left open.
+        mode (str): "encode" or "decode".
+        access (str): "r" to transform on read, "w" to transform on write.
+        codec (str): The name of a registered codec.
+        chunk_size (int): The bytes read or handed on per step.
+
+    Returns:
+        io.RawIOBase: A ``CodecReader`` or ``CodecWriter``.
+
+    Raises:
+        ValueError: If the mode, access or codec is not supported, or the
+            path cannot be opened.
+    """
+    if access not in ("r", "w"):
+        raise ValueError(f"Access {access} not supported, expected 'r' or 'w'")
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+    # Fails on an unknown mode or codec before a file is created.
+    _check_mode(mode)
+    get_codec(codec)
+
+    closefd = isinstance(file, str)
+    if closefd:
+        try:
+            file = io.open(file, access + "b")  # pylint: disable=consider-using-with
+        except OSError as err:
+            raise ValueError(f"Failed to open file '{file}': {err}") from err
+
+    wrapper = CodecReader if access == "r" else CodecWriter
+    return wrapper(file, mode=mode, codec=codec, chunk_size=chunk_size,
+                   closefd=closefd)
+
+
+__all__ = [
+    "CodecReader",
+    "CodecWriter",
+    "DEFAULT_WRAPPER_CHUNK_SIZE",
+    "open",
+]
@@ -0,0 +1,8 @@
+from .runner import BatchReport, BatchResult, collect_files, run_batch
+
+__all__ = [
+    "BatchReport",
+    "BatchResult",
+    "collect_files",
+    "run_batch",
+]
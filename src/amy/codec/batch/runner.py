@@ -0,0 +1,189 @@
+import glob
+import os
+import time
+from concurrent import futures
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple
+
+from amy.codec.base.manifest import MANIFEST_SUFFIX
+from amy.codec.base.ranges import INDEX_SUFFIX
+from amy.codec.decoding import Base64FileDecoder
+from amy.codec.encoding import Base64FileEncoder
+from amy.utils import ConfigNamespace
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a single file in a batch run."""
+    input_path: str
+    output_path: str = None
+    input_size: int = 0
+    output_size: int = 0
+    seconds: float = 0.0
+    skipped: bool = False
+    error: str = None
+
+    @property
+    def ok(self) -> bool:
+        """Returns True if the file was transformed successfully."""
+        return self.error is None
+
+
+@dataclass
+class BatchReport:
+    """Aggregated outcome of a batch run."""
+    mode: str
+    results: List[BatchResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> List[BatchResult]:
+        """Returns the results of all files that failed."""
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def skipped(self) -> List[BatchResult]:
+        """Returns the results of all files skipped as up to date."""
+        return [result for result in self.results if result.skipped]
+
+    @property
+    def input_bytes(self) -> int:
+        """Returns the total input size of all transformed files."""
+        return sum(result.input_size for result in self.results
+                   if result.ok and not result.skipped)
+
+    @property
+    def output_bytes(self) -> int:
+        """Returns the total output size of all transformed files."""
+        return sum(result.output_size for result in self.results
+                   if result.ok and not result.skipped)
+
+
+def _wanted(name: str, mode: str, suffix: str = ".b64") -> bool:
+    """Returns True if a file found by a walk or glob belongs to the mode."""
+    if name.endswith((MANIFEST_SUFFIX, INDEX_SUFFIX)):
+        return False
+    is_encoded = name.endswith(suffix)
+    return is_encoded if mode == "decode" else not is_encoded
+
+
+def _walk(directory: str, mode: str,
+          suffix: str = ".b64") -> Iterable[Tuple[str, int]]:
+    """Yields the paths and sizes of matching files below a directory."""
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file() and _wanted(entry.name, mode, suffix):
+                    yield entry.path, entry.stat().st_size
+
+
+def collect_files(patterns: Iterable[str], mode: str = "encode",
+                  suffix: str = ".b64") -> List[Tuple[str, int]]:
+    """
+    Expands file paths, glob patterns and directories into input files.
+
+    Directories are walked recursively and glob patterns expanded; in
+    decode mode only files ending in the codec's suffix are picked from
+    them, in encode mode everything else except manifests and range
+    indexes. Explicit paths are always kept, so missing files fail in the
+    batch rather than here.
+
+    Args:
+        patterns (Iterable[str]): The paths, patterns or directories.
+        mode (str): Either "encode" or "decode".
+        suffix (str): The suffix of encoded files, '.b64' by default.
+
+    Returns:
+        List[Tuple[str, int]]: The unique paths and their sizes, largest
+            first.
+    """
+    found = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found.update(_walk(pattern, mode, suffix))
+        elif glob.has_magic(pattern):
+            for path in glob.iglob(pattern, recursive=True):
+                if os.path.isfile(path) and \
+                        _wanted(os.path.basename(path), mode, suffix):
+                    found[path] = os.path.getsize(path)
+        else:
+            found[pattern] = (os.path.getsize(pattern)
+                              if os.path.isfile(pattern) else 0)
+
+    return sorted(found.items(), key=lambda item: item[1], reverse=True)
+
+
+def _run_job(options: dict) -> BatchResult:
+    """Transforms one file of a batch, catching any error."""
+    started = time.perf_counter()
+    encoding = options["mode"] == "encode"
+    codec = Base64FileEncoder() if encoding else Base64FileDecoder()
+
+    try:
+        codec.set_environment(ConfigNamespace(**options))
+        file = codec.process(encoding=encoding)
+        if codec.metrics:
+            codec.metrics.emit(codec.session.metrics())
+        return BatchResult(
+            input_path=file.input_path,
+            output_path=file.output_path,
+            input_size=file.input_size,
+            output_size=file.output_size,
+            seconds=time.perf_counter() - started,
+            skipped=codec.session.skipped,
+        )
+    except Exception as err:  # pylint: disable=broad-except
+        return BatchResult(
+            input_path=options["file"],
+            seconds=time.perf_counter() - started,
+            error=str(err),
+        )
+
+
+def run_batch(environment: ConfigNamespace,
+              files: List[Tuple[str, int]]) -> BatchReport:
+    """
+    Encodes or decodes many files through a pool of worker processes.
+
+    Files are submitted largest first, so long jobs start early and the
+    small ones fill the gaps at the end. Every worker handles whole files
+    single-threaded; the environment's ``jobs`` sets the pool size.
+
+    Args:
+        environment (ConfigNamespace): The shared options, as for a
+            single file. ``file`` and ``output`` are set per job.
+        files (List[Tuple[str, int]]): The inputs and their sizes, as
+            returned by ``collect_files``.
+
+    Returns:
+        BatchReport: The per-file results in submission order.
+    """
+    started = time.perf_counter()
+    options = environment.to_dict()
+    options.update(jobs=1, output=None)
+    jobs = [dict(options, file=path) for path, _ in files]
+    workers = min(getattr(environment, "jobs", 1) or os.cpu_count() or 1,
+                  len(jobs))
+
+    if workers <= 1:
+        results = [_run_job(job) for job in jobs]
+    else:
+        with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_job, jobs))
+
+    return BatchReport(
+        mode=environment.mode,
+        results=results,
+        seconds=time.perf_counter() - started,
+    )
+
+
+__all__ = [
+    "BatchReport",
+    "BatchResult",
+    "collect_files",
+    "run_batch",
+]
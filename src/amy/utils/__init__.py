@@ -1,11 +1,20 @@
 from .namespace import ConfigNamespace
-from .file_info import FileInfo
+from .digest_cache import DigestCache, get_digest_cache
+from .file_info import STDIO_PATH, FileInfo
 from .file_validator import FileValidator
 from .logger import Logger
+from .metrics import MetricsWriter
+from .profiler import StageProfiler, StageTiming
 
 __all__ = [
+    "STDIO_PATH",
     "ConfigNamespace",
+    "DigestCache",
     "FileInfo",
     "FileValidator",
     "Logger",
+    "MetricsWriter",
+    "StageProfiler",
+    "StageTiming",
+    "get_digest_cache",
 ]
@@ -0,0 +1,248 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Overrides the directory the default cache lives in.
+CACHE_DIR_ENV = "AMY_CACHE_DIR"
+# Set to "0" to disable the default cache.
+CACHE_ENV = "AMY_DIGEST_CACHE"
+
+CACHE_FILE = "digests.sqlite3"
+
+# Entries kept before the least recently used ones are evicted. An entry
+# takes roughly 200 bytes plus its path, so the default stays around 10 MB.
+DEFAULT_MAX_ENTRIES = 50_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT PRIMARY KEY,
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS digests_accessed ON digests (accessed);
+"""
+
+
+def default_cache_dir() -> str:
+    """Returns the directory of the default cache, following XDG."""
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "amy")
+
+
+def _key(stat: os.stat_result) -> tuple:
+    """Returns the fields that identify an unchanged file."""
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class DigestCache:
+    """
+    Persistent SHA-256 digests of files, stored in SQLite.
+
+    An entry is keyed by the absolute path and is only served while the
+    file's device, inode, size and ``mtime_ns`` still match, so a file that
+    was replaced or modified is hashed again. Once the cache holds more
+    than ``max_entries`` entries, the least recently used tenth is evicted.
+
+    The cache is an optimization only: when the database cannot be opened
+    or written, every lookup misses and digests are computed as before.
+    """
+
+    def __init__(self, path: str = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path or os.path.join(default_cache_dir(), CACHE_FILE)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Opens the database once per process, creating it if needed."""
+        if self._disabled:
+            return None
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False,
+                isolation_level=None)
+            # WAL lets batch workers read while another one writes.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+        except (sqlite3.Error, OSError):
+            self._disabled = True
+            return None
+
+        self._connection = connection
+        self._pid = os.getpid()
+        return connection
+
+    def get(self, path: str) -> Optional[str]:
+        """
+        Returns the cached digest of a file if it has not changed.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            Optional[str]: The hex digest, or None on a miss.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return self._lookup(os.path.abspath(path), stat)
+
+    def _lookup(self, path: str, stat: os.stat_result) -> Optional[str]:
+        """Returns the digest stored for the path and stat, if any."""
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return None
+            try:
+                row = connection.execute(
+                    "SELECT device, inode, size, mtime_ns, sha256 "
+                    "FROM digests WHERE path = ?", (path,)).fetchone()
+                if row is None or tuple(row[:4]) != _key(stat):
+                    return None
+                connection.execute(
+                    "UPDATE digests SET accessed = ? WHERE path = ?",
+                    (time.time(), path))
+                return row[4]
+            except sqlite3.Error:
+                return None
+
+    def put(self, path: str, digest: str,
+            stat: os.stat_result = None) -> None:
+        """
+        Stores the digest of a file under its identity.
+
+        Args:
+            path (str): The path of the file.
+            digest (str): The hex SHA-256 digest of its content.
+            stat (os.stat_result): The stat taken before the content was
+                read. The digest is only stored if the file still has it,
+                so a file changed while it was read is never cached under
+                its new identity. Without it the current stat is used.
+        """
+        try:
+            current = os.stat(path)
+        except OSError:
+            return
+        if stat is None:
+            stat = current
+        elif _key(current) != _key(stat):
+            return
+
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO digests VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?)",
+                    (os.path.abspath(path), *_key(stat), digest,
+                     time.time()))
+                self._evict(connection)
+            except sqlite3.Error:
+                pass
+
+    def digest(self, path: str, compute: Callable[[str], str]) -> str:
+        """
+        Returns the digest of a file, computing and storing it on a miss.
+
+        The file is stat'ed before and after ``compute`` runs, and the
+        result is only stored if the file did not change in between.
+
+        Args:
+            path (str): The path of the file.
+            compute (Callable[[str], str]): Hashes the file at a path.
+
+        Returns:
+            str: The hex digest.
+        """
+        try:
+            before = os.stat(path)
+        except OSError:
+            return compute(path)
+
+        cached = self._lookup(os.path.abspath(path), before)
+        if cached:
+            return cached
+
+        digest = compute(path)
+        self.put(path, digest, before)
+        return digest
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Drops the least recently used entries beyond the size bound."""
+        count = connection.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Evict down to 90% so eviction does not run on every insert.
+        excess = count - (self.max_entries * 9) // 10
+        connection.execute(
+            "DELETE FROM digests WHERE path IN (SELECT path FROM digests "
+            "ORDER BY accessed LIMIT ?)", (excess,))
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        with self._lock:
+            connection = self._connect()
+            if connection is not None:
+                connection.execute("DELETE FROM digests")
+
+    def close(self) -> None:
+        """Closes the database connection of this process."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def __str__(self) -> str:
+        return f"DigestCache({self.path})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+_caches: Dict[str, DigestCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_digest_cache(cache_dir: str = None) -> Optional[DigestCache]:
+    """
+    Returns the shared cache of a directory, or None if caching is off.
+
+    Args:
+        cache_dir (str): The cache directory, ``default_cache_dir()`` by
+            default.
+    """
+    if os.environ.get(CACHE_ENV) == "0":
+        return None
+    path = os.path.join(cache_dir or default_cache_dir(), CACHE_FILE)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = DigestCache(path)
+        return _caches[path]
+
+
+__all__ = [
+    "DEFAULT_MAX_ENTRIES",
+    "DigestCache",
+    "default_cache_dir",
+    "get_digest_cache",
+]
@@ -1,63 +1,120 @@
 import hashlib
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
+from .digest_cache import DigestCache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Path that stands for standard input as the input and standard output as
+# the output. Such streams can only be hashed while they are transformed.
+STDIO_PATH = "-"
+
 
 @dataclass
 class FileInfo:
     """Data class to store file information."""
     input_path: str
     output_path: str = None
+    input_size: int = None
+    output_size: int = None
+    input_hash: str = None
+    output_hash: str = None
+    # Codec the data was compressed with inside a container, if any, the
+    # size of the compressed data before Base64 and original / compressed.
+    compression: str = None
+    compressed_size: int = None
+    compression_ratio: float = None
+    # Serves and stores digests of unchanged files across runs.
+    cache: DigestCache = field(default=None, repr=False, compare=False)
+
+    def record(self, input_size: int, output_size: int,
+               input_hash: str = None, output_hash: str = None,
+               input_stat: os.stat_result = None) -> None:
+        """
+        Stores sizes and digests computed while the file was transformed,
+        so they do not have to be recomputed from disk.
+
+        The input digest is only cached given ``input_stat``, the stat
+        taken before the transform, and only if the input still has it.
+        """
+        self.input_size = input_size
+        self.output_size = output_size
+        self.input_hash = input_hash
+        self.output_hash = output_hash
+
+        if self.cache is not None:
+            if input_hash and input_stat is not None:
+                self.cache.put(self.input_path, input_hash, input_stat)
+            if output_hash and self.output_path and \
+                    self.output_path != STDIO_PATH:
+                self.cache.put(self.output_path, output_hash)
 
     @property
     def size(self) -> int:
         """Returns the file size in bytes."""
+        if self.input_size is not None:
+            return self.input_size
         try:
             return os.path.getsize(self.input_path)
         except OSError as err:
             raise ValueError(
                 f"Unable to determine size of file '{self.input_path}': {err}") from err
 
-    def _read_file(self, file_path: str) -> bytes:
+    @property
+    def written_size(self) -> int:
+        """Returns the output file size in bytes."""
+        if self.output_size is not None:
+            return self.output_size
+        try:
+            return os.path.getsize(self.output_path)
+        except (OSError, TypeError) as err:
+            raise ValueError(
+                f"Unable to determine size of file '{self.output_path}': {err}") from err
+
+    def _hash_file(self, file_path: str) -> str:
         """
-        Reads the content of a file and returns it as bytes.
+        Calculates the SHA256 hash of a file, reading it chunk by chunk.
 
         Args:
-            file_path (str): The path to the file to read.
+            file_path (str): The path to the file to hash.
 
         Returns:
-            bytes: The content of the file.
+            str: The hash in hexadecimal format.
         """
-        try:
-            with open(file_path, 'rb') as file:
-                return file.read()
-        except OSError as err:
-            raise ValueError(
-                f"Failed to read file '{file_path}': {err}") from err
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            while chunk := file.read(HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def digest(self, file_path: str) -> str:
+        """Returns the digest of a file, from the cache when possible."""
+        if self.cache is None:
+            return self._hash_file(file_path)
+        return self.cache.digest(file_path, self._hash_file)
 
     def sha256_hash(self) -> List[str]:
         """
         Calculates the SHA256 hash of the file.
 
         Returns a list of strings representing the hash in hexadecimal format
-        for both input and output files.
+        for both input and output files. Digests recorded during the
+        transform are returned as they are, without reading the files again,
+        and so are cached digests of files that did not change since.
         """
-        hasher = hashlib.sha256()
-        input_hash = ""
-        output_hash = ""
+        input_hash = self.input_hash or ""
+        output_hash = self.output_hash or ""
 
         try:
             # Calculate hash for input file
-            input_data = self._read_file(self.input_path)
-            hasher.update(input_data)
-            input_hash = hasher.hexdigest()
-            # Calculate hash for output file if it exists-
-            if self.output_path:
-                hasher = hashlib.sha256()  # Reset the hasher
-                output_data = self._read_file(self.output_path)
-                hasher.update(output_data)
-                output_hash = hasher.hexdigest()
+            if not input_hash and self.input_path != STDIO_PATH:
+                input_hash = self.digest(self.input_path)
+            # Calculate hash for output file if it exists
+            if self.output_path and not output_hash and \
+                    self.output_path != STDIO_PATH:
+                output_hash = self.digest(self.output_path)
         except OSError as err:
             raise ValueError(
                 f"Failed to read file '{self.input_path}' or '{self.output_path}': {err}") from err
@@ -79,5 +136,6 @@ class FileInfo:
             "input_path": self.input_path,
             "output_path": self.output_path,
             "size": self.size,
+            "output_size": self.output_size,
             "extension": self.extension(),
         }
@@ -1,30 +1,67 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import sys
 from dataclasses import dataclass
-from typing import Any
-import threading
-
-from rich.console import Console
-from rich.logging import RichHandler
-from rich.table import Table
-from rich.traceback import install
+from typing import Any, Dict, List, Sequence, TextIO, Tuple
 
 from .file_info import FileInfo
 
-# Install rich traceback for better debugging
-install(extra_lines=5)
+# Set to any non-empty value to force plain output on a terminal.
+PLAIN_ENV = "AMY_PLAIN"
+
+# (header, justify, style) of a summary table column.
+Column = Tuple[str, str, str]
+
+
+class LevelFormatter(logging.Formatter):
+    """Formats each record with the format registered for its level."""
+
+    def __init__(self, default: str, formats: Dict[int, str] = None):
+        super().__init__(default)
+        # Sorted from the highest level down, so the first match wins.
+        self._formatters = sorted(
+            ((level, logging.Formatter(fmt))
+             for level, fmt in (formats or {}).items()),
+            key=lambda item: item[0], reverse=True)
+
+    def format(self, record: logging.LogRecord) -> str:
+        for level, formatter in self._formatters:
+            if record.levelno >= level:
+                return formatter.format(record)
+        return super().format(record)
 
 
 class Logger:
-    """Handles logging functionality using RichHandler and Console."""
+    """
+    Handles logging functionality using RichHandler and Console.
+
+    Rich is only imported when pretty output is used: on a terminal by
+    default, or after ``set_pretty(True)``. Otherwise log records and
+    summary tables are written as plain text with the standard library,
+    which keeps the start-up cost of scripted runs low.
+
+    Logging calls only put the record on a queue; a QueueListener thread
+    formats and renders it, choosing the format by level. Callers on
+    worker threads therefore never wait for the console.
+
+    Everything is written to standard output unless ``set_stream`` moves
+    it, for example to standard error while standard output carries data.
+    """
     _std_log_fmt = "\nLog-Time:\t%(asctime)s\nMessage:\t%(message)s\nFile:\t\t%(pathname)s\nLineO:\t\t%(lineno)d)"
     _err_log_fmt = "%(asctime)s - %(levelname)s: %(message)s (%(pathname)s:%(lineno)d)"
-    _timer = None
-    _timer_lock = threading.Lock()
+    _plain_log_fmt = "%(asctime)s - %(levelname)s: %(message)s"
 
     _instance: "Logger" = None
     logger: logging.Logger = None
-    handler: RichHandler = None
-    console: Console = None
+    handler: logging.Handler = None
+    listener: logging.handlers.QueueListener = None
+    pretty: bool = False
+    stream: TextIO = None
+    _queue: queue.Queue = None
+    _console: Any = None
 
     def __new__(cls, *args, **kwargs):
         """Singleton pattern to ensure only one instance of Logger exists."""
@@ -38,32 +75,142 @@ class Logger:
         self.logger = logging.getLogger("rich_logger")
         self.logger.setLevel(level)
 
-        # Define the log format to include file name and line number
-        self.handler = RichHandler(rich_tracebacks=True, console=Console())
-        self.handler.setFormatter(logging.Formatter(self._std_log_fmt))
+        self._queue = queue.Queue()
+        self.logger.addHandler(logging.handlers.QueueHandler(self._queue))
+
+        self.stream = sys.stdout
+        self.set_pretty(self.stream.isatty() and not os.environ.get(PLAIN_ENV))
+
+        atexit.register(self.stop)
+        if hasattr(os, "register_at_fork"):
+            # A forked worker inherits the queue but not the listener thread.
+            os.register_at_fork(after_in_child=self._restart)
+
+    def set_pretty(self, pretty: bool) -> None:
+        """
+        Switches between Rich and plain-text output.
+
+        Args:
+            pretty (bool): True to log through RichHandler and print Rich
+                tables, False to use a plain logging.StreamHandler.
+        """
+        if self.handler is not None and pretty == self.pretty:
+            return
+
+        if pretty:
+            # pylint: disable=import-outside-toplevel
+            from rich.logging import RichHandler
+            from rich.traceback import install
+
+            # Install rich traceback for better debugging
+            install(extra_lines=5)
+            handler = RichHandler(rich_tracebacks=True, console=self.console)
+            default_fmt = self._std_log_fmt
+        else:
+            handler = logging.StreamHandler(self.stream)
+            default_fmt = self._plain_log_fmt
+
+        # Errors are formatted on one line with their origin
+        handler.setFormatter(LevelFormatter(
+            default_fmt, {logging.ERROR: self._err_log_fmt}))
+
+        self.stop()
+        self.handler = handler
+        self.pretty = pretty
+        self._start()
+
+    def set_stream(self, stream: TextIO) -> None:
+        """
+        Writes all records, tables and messages to another text stream.
+
+        Args:
+            stream (TextIO): The new stream, usually ``sys.stderr`` when
+                standard output carries encoded or decoded data.
+        """
+        if stream is self.stream:
+            return
+        self.flush()
+        self.stream = stream
+        self._console = None
+        # Rebuild the handler around the new stream.
+        self.handler = None
+        self.set_pretty(self.pretty)
+
+    def _start(self) -> None:
+        """Starts the listener that renders queued records."""
+        self.listener = logging.handlers.QueueListener(
+            self._queue, self.handler, respect_handler_level=True)
+        self.listener.start()
+
+    def _restart(self) -> None:
+        """Gives a forked child a fresh queue and listener thread."""
+        self._queue = queue.Queue()
+        self.logger.handlers = [logging.handlers.QueueHandler(self._queue)]
+        self._start()
+
+    def flush(self) -> None:
+        """Waits until every queued record has been rendered."""
+        if self.listener is not None:
+            self._queue.join()
+
+    def stop(self) -> None:
+        """Renders the queued records and stops the listener thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    @property
+    def console(self) -> Any:
+        """Returns the Rich Console for styled output, created on first use."""
+        if self._console is None:
+            from rich.console import Console  # pylint: disable=import-outside-toplevel
+            self._console = Console(file=self.stream)
+        return self._console
+
+    def _print_table(self, title: str, columns: Sequence[Column],
+                     rows: List[Sequence[str]]) -> None:
+        """Prints a table with Rich, or as tab-separated text when plain."""
+        # Keep the table after any records that are still queued
+        self.flush()
+        if not self.pretty:
+            lines = [title, "\t".join(header for header, _, _ in columns)]
+            lines.extend("\t".join(row) for row in rows)
+            self.stream.write("\n".join(lines) + "\n")
+            return
+
+        from rich.table import Table  # pylint: disable=import-outside-toplevel
 
-        self.logger.addHandler(self.handler)
+        table = Table(title=title)
+        for header, justify, style in columns:
+            table.add_column(header, justify=justify, style=style,
+                             no_wrap=header == "File")
+        for row in rows:
+            table.add_row(*row)
 
-        # Create a Console instance for direct styled output
-        self.console = Console()
+        # Print the table directly to the console
+        self.console.print(table)
 
     def log_summary(self, file: FileInfo, mode: str = "encoded") -> None:
         """Logs encoding summary using RichHandler."""
         try:
             input_hash, output_hash = file.sha256_hash()
 
-            # Create the summary table
-            table = Table(title="File Encoding Summary")
-            table.add_column("File", justify="left",
-                             style="cyan", no_wrap=True)
-            table.add_column("Size (bytes)", justify="right", style="magenta")
-            table.add_column("SHA256 Hash", justify="left", style="green")
+            # Print the summary table
+            self._print_table("File Encoding Summary", [
+                ("File", "left", "cyan"),
+                ("Size (bytes)", "right", "magenta"),
+                ("SHA256 Hash", "left", "green"),
+            ], [
+                (file.input_path, str(file.size), input_hash),
+                (file.output_path, str(file.written_size), output_hash),
+            ])
 
-            table.add_row(file.input_path, str(file.size), input_hash)
-            table.add_row(file.output_path, str(file.size), output_hash)
-
-            # Print the summary table directly to the console
-            self.console.print(table)
+            if file.compression:
+                self.info(
+                    f"Compressed with {file.compression}: "
+                    f"{file.compressed_size} bytes before Base64, "
+                    f"ratio {file.compression_ratio or 0:.2f}:1"
+                )
 
             # Log the success message
             self.info(
@@ -72,10 +219,96 @@ class Logger:
         except Exception as err:  # pylint: disable=broad-except
             self.error(f"Logging Error from summary: {err}")
 
+    def log_batch_summary(self, report: Any) -> None:
+        """Logs one aggregated summary table for a batch run."""
+        try:
+            failed = report.failed
+            seconds = report.seconds or float("nan")
+            throughput = report.input_bytes / seconds / 1024 / 1024
+
+            self._print_table("Batch Summary", [
+                ("Files", "right", "cyan"),
+                ("Failed", "right", "red"),
+                ("Skipped", "right", "yellow"),
+                ("Input (bytes)", "right", "magenta"),
+                ("Output (bytes)", "right", "magenta"),
+                ("Time (s)", "right", "green"),
+                ("MB/s", "right", "green"),
+            ], [(
+                str(len(report.results)), str(len(failed)),
+                str(len(report.skipped)), str(report.input_bytes),
+                str(report.output_bytes),
+                f"{report.seconds:.2f}", f"{throughput:.1f}",
+            )])
+
+            for result in failed:
+                self.error(f"{result.input_path}: {result.error}")
+
+            self.info(
+                f"{len(report.results) - len(failed)} of "
+                f"{len(report.results)} files {report.mode}d"
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            self.error(f"Logging Error from batch summary: {err}")
+
+    def log_verify(self, result: Any) -> None:
+        """Logs the outcome of verifying an encoded file."""
+        try:
+            seconds = result.seconds or float("nan")
+            self._print_table("Verify Summary", [
+                ("File", "left", "cyan"),
+                ("Compared (bytes)", "right", "magenta"),
+                ("SHA256 Hash", "left", "green"),
+                ("MB/s", "right", "green"),
+            ], [(
+                f"{result.encoded_path} -> {result.original_path}",
+                str(result.size), result.sha256 or "",
+                f"{result.size / seconds / 1024 / 1024:.1f}",
+            )])
+
+            if result.match:
+                self.info(f"File '{result.encoded_path}' decodes to "
+                          f"'{result.original_path}'")
+            else:
+                self.error(f"File '{result.encoded_path}' differs from "
+                           f"'{result.original_path}' at byte "
+                           f"{result.mismatch_offset}")
+        except Exception as err:  # pylint: disable=broad-except
+            self.error(f"Logging Error from verify summary: {err}")
+
+    def log_profile(self, profiler: Any) -> None:
+        """Logs the time, bytes and throughput of every profiled stage."""
+        try:
+            stages = profiler.stages
+            total = sum(timing.seconds for timing in stages
+                        if timing.name != "total") or float("nan")
+
+            rows = []
+            for timing in stages:
+                share = "" if timing.name == "total" else \
+                    f"{100 * timing.seconds / total:.1f}%"
+                rows.append((
+                    timing.name, f"{timing.seconds:.4f}", str(timing.bytes),
+                    f"{timing.throughput:.1f}" if timing.throughput else "",
+                    share))
+
+            self._print_table("Stage Profile", [
+                ("Stage", "left", "cyan"),
+                ("Time (s)", "right", "green"),
+                ("Bytes", "right", "magenta"),
+                ("MB/s", "right", "green"),
+                ("Share", "right", "yellow"),
+            ], rows)
+        except Exception as err:  # pylint: disable=broad-except
+            self.error(f"Logging Error from profile: {err}")
+
     def log(self, message: Any = "", style: str = "") -> None:
         """Logs a message to the console with optional styling."""
         try:
-            if style:
+            self.flush()
+            if not self.pretty:
+                self.stream.write(f"{message}\n")
+            elif style:
                 self.console.print(f"[{style}]{message}[/{style}]")
             else:
                 self.console.print(message)
@@ -103,37 +336,8 @@ class Logger:
         except Exception as err:  # pylint: disable=broad-except
             self.error(f"Logging Error: {err}")
 
-    def timed_format(self) -> str:
-        """Sets the logger format to the _err_log_fmt for a specific time
-        using threading to avoid hanging the main thread.
-
-        Default: _std_log_fmt
-        """
-
-        fmt_time = 0.2
-
-        try:
-            self.logger.handlers[0].setFormatter(
-                logging.Formatter(self._err_log_fmt))
-            self._timer = threading.Timer(fmt_time, self._reset_format)
-            self._timer.start()
-        except Exception as err:  # pylint: disable=broad-except
-            self.error(f"Logging Error in timed_format: {err}")
-
-    def _reset_format(self) -> None:
-        """Resets the logger format to the _std_log_fmt."""
-        try:
-            with self._timer_lock:
-                if self._timer:
-                    self._timer.cancel()
-                    self.logger.handlers[0].setFormatter(
-                        logging.Formatter(self._std_log_fmt))
-        except Exception as err:  # pylint: disable=broad-except
-            self.error(f"Logging Error in _reset_format: {err}")
-
     def error(self, message: Any = "", stacklevel: int = 2) -> None:
         """Logs an error message."""
-        self.timed_format()
         try:
             self.logger.error(message, stacklevel=stacklevel)
         except Exception as err:  # pylint: disable=broad-except
@@ -142,6 +346,10 @@ class Logger:
     def styled_info(self, message: Any = "", style: str = "bold blue") -> None:
         """Prints an info message with styling."""
         try:
+            self.flush()
+            if not self.pretty:
+                self.stream.write(f"INFO: {message}\n")
+                return
             self.console.print(f"[{style}]INFO: {message}[/{style}]")
         except Exception as err:  # pylint: disable=broad-except
             self.error(f"Logging Error: {err}")
@@ -0,0 +1,56 @@
+import json
+import sys
+import threading
+from typing import Any, Dict, TextIO
+
+# Path that selects standard output instead of a file.
+STDOUT = "-"
+
+
+class MetricsWriter:
+    """
+    Writes job metrics as JSON lines to a file or standard output.
+
+    Every record is serialized to a single line and written with one
+    ``write`` call to a file opened for appending, so several processes
+    of a batch run can share one metrics file without interleaving.
+    """
+
+    def __init__(self, path: str = STDOUT):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _open(self) -> TextIO:
+        """Opens the metrics file for appending."""
+        try:
+            return open(self.path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+        except OSError as err:
+            raise ValueError(
+                f"Failed to open metrics file '{self.path}': {err}") from err
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        """
+        Writes one record as a JSON line.
+
+        Args:
+            record (Dict[str, Any]): JSON-serializable job metrics.
+        """
+        line = json.dumps(record, separators=(",", ":"), sort_keys=True)
+        with self._lock:
+            if self.path == STDOUT:
+                sys.stdout.write(line + "\n")
+                sys.stdout.flush()
+                return
+            with self._open() as target:
+                target.write(line + "\n")
+
+    def __str__(self) -> str:
+        return f"MetricsWriter({self.path})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+__all__ = [
+    "MetricsWriter",
+]
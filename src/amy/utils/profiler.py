@@ -0,0 +1,131 @@
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List
+
+# Stage names reported by the codec engines, in pipeline order.
+STAGES = ("read", "transform", "write", "hash")
+
+
+@dataclass
+class StageTiming:
+    """Accumulated time and bytes of one stage."""
+    name: str
+    seconds: float = 0.0
+    bytes: int = 0
+    calls: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Returns the stage throughput in MiB/s, 0 if nothing was timed."""
+        if not self.seconds:
+            return 0.0
+        return self.bytes / self.seconds / 1024 / 1024
+
+    def to_dict(self) -> dict:
+        """Converts the StageTiming object to a dictionary."""
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "bytes": self.bytes,
+            "calls": self.calls,
+            "throughput": self.throughput,
+        }
+
+
+class StageProfiler:
+    """
+    Collects per-stage timings of codec jobs.
+
+    The engines time their stages in tight loops with ``perf_counter`` and
+    hand the totals over once per job, so profiling is always on and costs
+    a few clock reads per chunk. Subscribers are called once per recorded
+    stage with ``(stage, seconds, nbytes)``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, StageTiming] = {}
+        self._hooks: List[Callable[[str, float, int], Any]] = []
+
+    def subscribe(self, callback: Callable[[str, float, int], Any]) -> None:
+        """Registers a callback invoked for every recorded stage."""
+        with self._lock:
+            self._hooks.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str, float, int], Any]) -> None:
+        """Removes a previously registered callback."""
+        with self._lock:
+            self._hooks.remove(callback)
+
+    def record(self, stage: str, seconds: float, nbytes: int = 0) -> None:
+        """
+        Adds the time and bytes of one run of a stage.
+
+        Args:
+            stage (str): The stage name, e.g. "read" or "summary".
+            seconds (float): The time spent in the stage.
+            nbytes (int): The number of bytes the stage handled.
+        """
+        with self._lock:
+            timing = self._stages.get(stage)
+            if timing is None:
+                timing = self._stages[stage] = StageTiming(stage)
+            timing.seconds += seconds
+            timing.bytes += nbytes
+            timing.calls += 1
+            hooks = list(self._hooks)
+
+        for hook in hooks:
+            hook(stage, seconds, nbytes)
+
+    @contextmanager
+    def measure(self, stage: str, nbytes: int = 0) -> Iterator[None]:
+        """Times the enclosed block as one run of the stage."""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - started, nbytes)
+
+    def record_stats(self, stats: Any) -> None:
+        """
+        Records the stage times gathered by an engine.
+
+        Args:
+            stats (StreamStats): The statistics returned by an engine.
+        """
+        self.record("read", stats.read_seconds, stats.bytes_read)
+        self.record("transform", stats.transform_seconds, stats.bytes_read)
+        self.record("write", stats.write_seconds, stats.bytes_written)
+        self.record("hash", stats.hash_seconds,
+                    stats.bytes_read + stats.bytes_written)
+
+    @property
+    def stages(self) -> List[StageTiming]:
+        """Returns the timings in the order the stages were first seen."""
+        with self._lock:
+            return list(self._stages.values())
+
+    def reset(self) -> None:
+        """Discards all recorded timings, keeping the subscribers."""
+        with self._lock:
+            self._stages.clear()
+
+    def to_dict(self) -> dict:
+        """Converts the recorded timings to a dictionary."""
+        return {timing.name: timing.to_dict() for timing in self.stages}
+
+    def __str__(self) -> str:
+        return f"StageProfiler({', '.join(self._stages)})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+__all__ = [
+    "STAGES",
+    "StageProfiler",
+    "StageTiming",
+]
@@ -0,0 +1,20 @@
+from .importtime import ImportTime, measure_import, parse_importtime
+from .inputs import format_size, generate_encoded, generate_input, parse_size
+from .runner import (
+    BenchmarkReport, Case, Measurement, build_cases, compare, run_benchmarks)
+
+__all__ = [
+    "BenchmarkReport",
+    "Case",
+    "ImportTime",
+    "Measurement",
+    "build_cases",
+    "compare",
+    "format_size",
+    "generate_encoded",
+    "generate_input",
+    "measure_import",
+    "parse_importtime",
+    "parse_size",
+    "run_benchmarks",
+]
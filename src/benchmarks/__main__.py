@@ -0,0 +1,161 @@
+"""
+Benchmarks the codec engines, the CLI and the legacy scripts.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks --sizes 1K,1M,64M --output results.json
+    python -m benchmarks --sizes 4G --engines stream,parallel --jobs 0
+    python -m benchmarks --compare results.json
+    python -m benchmarks --importtime
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from rich.console import Console
+from rich.table import Table
+
+from .importtime import MODULES, measure_import
+from .inputs import format_size, parse_size
+from .runner import (
+    DIRECTIONS, ENGINES, Measurement, build_cases, compare, run_benchmarks)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Base64 engines across file sizes")
+
+    parser.add_argument(
+        "--sizes",
+        default="1K,1M,16M,256M",
+        help="Comma-separated input sizes, e.g. 1K,16M,4G"
+    )
+
+    parser.add_argument(
+        "--engines",
+        default=",".join(ENGINES),
+        help=f"Comma-separated engines out of {', '.join(ENGINES)}"
+    )
+
+    parser.add_argument(
+        "--directions",
+        default=",".join(DIRECTIONS),
+        help="Comma-separated directions (encode, decode)"
+    )
+
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=0,
+        help="Workers for the parallel engine, 0 for all cores"
+    )
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per case; the fastest one is reported"
+    )
+
+    parser.add_argument(
+        "--workdir",
+        default=os.path.join(tempfile.gettempdir(), "amy-benchmarks"),
+        help="Directory for generated inputs and outputs"
+    )
+
+    parser.add_argument(
+        "--output", "-o",
+        help="Write the results as JSON to this file"
+    )
+
+    parser.add_argument(
+        "--compare",
+        help="A previous JSON result file to compare throughput against"
+    )
+
+    parser.add_argument(
+        "--importtime",
+        action="store_true",
+        help="Measure the import cost of the CLI and library modules "
+             "with -X importtime instead of the engines"
+    )
+
+    return parser.parse_args()
+
+
+def print_measurement(console: Console, result: Measurement) -> None:
+    """Prints a single result line while the benchmark runs."""
+    label = f"{result.engine:<9} {result.direction:<6} " \
+            f"{format_size(result.size):>6}"
+    if result.error:
+        console.print(f"[red]{label}  failed:[/red] {result.error}")
+        return
+    rss = f"{result.peak_rss_kb / 1024:.1f} MB" \
+        if result.peak_rss_kb is not None else "n/a"
+    console.print(f"{label}  {result.mb_per_s:9.1f} MB/s  "
+                  f"{result.seconds:8.3f} s  peak RSS {rss}")
+
+
+def print_import_times(console: Console, repeat: int) -> None:
+    """Prints the import cost of each module and its heaviest imports."""
+    for module in MODULES:
+        result = measure_import(module, repeat=repeat)
+        table = Table(title=f"import {module}: "
+                            f"{result.cumulative_us / 1000:.1f} ms")
+        table.add_column("Module", style="cyan")
+        table.add_column("Self (ms)", justify="right")
+        table.add_column("Cumulative (ms)", justify="right", style="green")
+        for name, self_us, cumulative_us in result.heaviest:
+            table.add_row(name, f"{self_us / 1000:.2f}",
+                          f"{cumulative_us / 1000:.2f}")
+        console.print(table)
+
+
+def main() -> None:
+    """
+    Main function to run the benchmarks.
+    """
+    args = parse_arguments()
+    console = Console()
+
+    if args.importtime:
+        print_import_times(console, repeat=args.repeat)
+        return
+
+    cases = build_cases(
+        sizes=[parse_size(size) for size in args.sizes.split(",")],
+        engines=args.engines.split(","),
+        directions=args.directions.split(","),
+        jobs=args.jobs,
+    )
+    report = run_benchmarks(
+        cases, args.workdir, repeat=args.repeat,
+        progress=lambda result: print_measurement(console, result))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report.to_json())
+        console.print(f"Results written to '{args.output}'")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+
+        table = Table(title=f"Compared to {baseline['meta'].get('commit')}")
+        table.add_column("Case", style="cyan")
+        table.add_column("Before (MB/s)", justify="right")
+        table.add_column("After (MB/s)", justify="right")
+        table.add_column("Ratio", justify="right", style="green")
+        for label, before, after, ratio in compare(baseline, report):
+            table.add_row(label, f"{before:.1f}", f"{after:.1f}",
+                          f"{ratio:.2f}x")
+        console.print(table)
+
+
+if __name__ == "__main__":
+    main()
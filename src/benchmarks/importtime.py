@@ -0,0 +1,84 @@
+"""
+Measures interpreter start-up cost with ``python -X importtime``.
+
+Every measurement imports one module in a fresh interpreter and parses
+the per-module self and cumulative times the interpreter prints to
+stderr, so the cost of the CLI and of the library entry points can be
+tracked across commits.
+"""
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from .runner import ROOT_DIR, SRC_DIR
+
+# Modules whose import cost is reported by default.
+MODULES = ("run", "amy.codec", "amy.utils")
+
+
+@dataclass
+class ImportTime:
+    """The import cost of one module, in microseconds."""
+    module: str
+    cumulative_us: int
+    # The most expensive imports as (module, self time, cumulative time).
+    heaviest: List[Tuple[str, int, int]] = field(default_factory=list)
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    """
+    Parses the stderr of ``-X importtime`` into (module, self, cumulative).
+
+    Lines that do not belong to the import report are skipped.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        entries.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return entries
+
+
+def measure_import(module: str, repeat: int = 5,
+                   top: int = 10) -> ImportTime:
+    """
+    Imports a module in fresh interpreters and keeps the fastest run.
+
+    Args:
+        module (str): The module to import, e.g. "run".
+        repeat (int): How many interpreters to start.
+        top (int): How many of the heaviest imports to keep.
+
+    Returns:
+        ImportTime: The total cost and the heaviest imports of the best run.
+    """
+    # Output is captured, so this measures the non-interactive path.
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, ROOT_DIR]))
+
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SRC_DIR, env=env, capture_output=True, text=True,
+            check=True)
+        entries = parse_importtime(completed.stderr)
+        total = next((cumulative for name, _, cumulative in entries
+                      if name == module), 0)
+        if best is None or total < best.cumulative_us:
+            heaviest = sorted(entries, key=lambda entry: entry[1],
+                              reverse=True)[:top]
+            best = ImportTime(module, total, heaviest)
+    return best
+
+
+__all__ = [
+    "MODULES",
+    "ImportTime",
+    "measure_import",
+    "parse_importtime",
+]
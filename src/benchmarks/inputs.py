@@ -0,0 +1,53 @@
+import os
+import re
+
+from amy.codec.base.stream import encode_stream
+
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+_WRITE_CHUNK = 1024 * 1024
+
+
+def parse_size(text: str) -> int:
+    """Parses sizes like '512', '1K', '16M' or '4G' into bytes."""
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)B?\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size '{text}'.")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def format_size(size: int) -> str:
+    """Formats a byte count with the largest unit that divides it."""
+    for unit in ("G", "M", "K"):
+        if size and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return str(size)
+
+
+def generate_input(directory: str, size: int) -> str:
+    """
+    Writes a file of random bytes of the given size, reusing an existing
+    one of the same size, and returns its path.
+    """
+    path = os.path.join(directory, f"input-{format_size(size)}.bin")
+    if os.path.isfile(path) and os.path.getsize(path) == size:
+        return path
+
+    with open(path, 'wb') as file:
+        remaining = size
+        while remaining:
+            chunk = os.urandom(min(_WRITE_CHUNK, remaining))
+            file.write(chunk)
+            remaining -= len(chunk)
+    return path
+
+
+def generate_encoded(path: str) -> str:
+    """Writes the Base64 encoding of an input next to it, if missing."""
+    encoded_path = f"{path}.b64"
+    if os.path.isfile(encoded_path) and \
+            os.path.getmtime(encoded_path) >= os.path.getmtime(path):
+        return encoded_path
+
+    with open(path, 'rb') as source, open(encoded_path, 'wb') as target:
+        encode_stream(source, target)
+    return encoded_path
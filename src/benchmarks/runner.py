@@ -0,0 +1,242 @@
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from .inputs import format_size, generate_encoded, generate_input
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+
+ENGINES = ("codec", "stream", "pipeline", "mmap", "parallel", "cli",
+           "legacy")
+DIRECTIONS = ("encode", "decode")
+
+# The legacy scripts hard-code their input, so they are driven by import.
+_LEGACY = {
+    "encode": "import to_b64; to_b64.Base64FileEncoder.from_file({path!r})"
+              ".encode()",
+    "decode": "import to_exe; to_exe.Base64FileDecoder.from_file({path!r})"
+              ".decode()",
+}
+
+
+@dataclass
+class Case:
+    """A single engine/direction/size combination to measure."""
+    engine: str
+    direction: str
+    size: int
+    jobs: int = 1
+
+
+@dataclass
+class Measurement:
+    """The result of running one case."""
+    engine: str
+    direction: str
+    size: int
+    jobs: int
+    seconds: float
+    wall_seconds: float
+    mb_per_s: float
+    peak_rss_kb: Optional[int]
+    error: Optional[str] = None
+
+
+@dataclass
+class BenchmarkReport:
+    """All measurements of a run plus the environment they were taken in."""
+    meta: Dict[str, object] = field(default_factory=dict)
+    results: List[Measurement] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        """Serializes the report to JSON."""
+        return json.dumps(
+            {"meta": self.meta,
+             "results": [asdict(result) for result in self.results]},
+            indent=2)
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, check=True,
+            capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def collect_meta() -> Dict[str, object]:
+    """Describes the machine and tree the benchmark runs on."""
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _command(case: Case, input_path: str, output_path: str) -> List[str]:
+    """Builds the command line that runs a case in a fresh interpreter."""
+    python = sys.executable
+    if case.engine == "legacy":
+        return [python, "-c", _LEGACY[case.direction].format(path=input_path)]
+    if case.engine == "cli":
+        return [python, os.path.join(SRC_DIR, "run.py"),
+                f"--{case.direction}", "--file", input_path,
+                "--output", output_path, "--jobs", str(case.jobs)]
+    if case.engine == "codec":
+        return [python, "-m", "benchmarks.worker", "codec", case.direction,
+                input_path, output_path]
+
+    engine = "stream" if case.engine == "parallel" else case.engine
+    return [python, "-m", "benchmarks.worker", "session", case.direction,
+            input_path, output_path, engine, str(case.jobs)]
+
+
+def _spawn(command: List[str], cwd: str) -> tuple:
+    """Runs a command and returns its exit code, output and peak RSS."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, ROOT_DIR]))
+    with tempfile.TemporaryFile() as stdout, \
+            tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            command, cwd=cwd, env=env, stdout=stdout, stderr=stderr)
+
+        peak_rss = None
+        if hasattr(os, "wait4"):
+            # wait4 reports the resource usage of exactly this child.
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss = usage.ru_maxrss
+            if sys.platform == "darwin":
+                peak_rss //= 1024
+        else:
+            process.wait()
+
+        stdout.seek(0)
+        stderr.seek(0)
+        return process.returncode, stdout.read(), stderr.read(), peak_rss
+
+
+def _prepare(case: Case, workdir: str) -> tuple:
+    """Returns the input and output paths for a case."""
+    path = generate_input(workdir, case.size)
+    if case.direction == "decode":
+        path = generate_encoded(path)
+
+    if case.engine != "legacy":
+        return path, os.path.join(workdir, f"output-{case.engine}.tmp")
+
+    # The legacy scripts derive the output name from the input name.
+    legacy_dir = os.path.join(workdir, "legacy")
+    os.makedirs(legacy_dir, exist_ok=True)
+    legacy_path = os.path.join(legacy_dir, os.path.basename(path))
+    shutil.copyfile(path, legacy_path)
+    output = f"{legacy_path}.b64" if case.direction == "encode" \
+        else legacy_path[:-4]
+    return legacy_path, output
+
+
+def run_case(case: Case, workdir: str) -> Measurement:
+    """Measures one case in a subprocess and cleans up its output."""
+    input_path, output_path = _prepare(case, workdir)
+    command = _command(case, input_path, output_path)
+
+    started = time.perf_counter()
+    code, stdout, stderr, peak_rss = _spawn(command, cwd=workdir)
+    wall = time.perf_counter() - started
+
+    seconds, error = wall, None
+    if code != 0:
+        error = stderr.decode(errors="replace").strip()[-500:]
+    elif case.engine in ("codec", "stream", "pipeline", "mmap", "parallel"):
+        seconds = json.loads(stdout.decode().splitlines()[-1])["seconds"]
+
+    for path in {output_path, input_path if case.engine == "legacy" else None}:
+        if path and os.path.isfile(path):
+            os.remove(path)
+
+    return Measurement(
+        engine=case.engine,
+        direction=case.direction,
+        size=case.size,
+        jobs=case.jobs,
+        seconds=seconds,
+        wall_seconds=wall,
+        mb_per_s=case.size / seconds / 1024 / 1024 if seconds else 0.0,
+        peak_rss_kb=peak_rss,
+        error=error,
+    )
+
+
+def build_cases(sizes: List[int], engines: List[str],
+                directions: List[str], jobs: int) -> List[Case]:
+    """Builds the cross product of the requested sizes and engines."""
+    return [
+        Case(engine=engine, direction=direction, size=size,
+             jobs=jobs if engine == "parallel" else 1)
+        for size in sizes
+        for engine in engines
+        for direction in directions
+    ]
+
+
+def run_benchmarks(cases: List[Case], workdir: str,
+                   repeat: int = 1, progress=None) -> BenchmarkReport:
+    """
+    Runs every case ``repeat`` times and keeps the fastest run of each.
+
+    Args:
+        cases (List[Case]): The cases to measure.
+        workdir (str): Where inputs are generated and outputs written.
+        repeat (int): How often each case is run.
+        progress: Optional callback receiving each finished Measurement.
+
+    Returns:
+        BenchmarkReport: The measurements and run metadata.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    report = BenchmarkReport(meta=collect_meta())
+    report.meta["repeat"] = repeat
+
+    for case in cases:
+        runs = [run_case(case, workdir) for _ in range(repeat)]
+        best = min(runs, key=lambda run: (run.error is not None, run.seconds))
+        report.results.append(best)
+        if progress:
+            progress(best)
+
+    return report
+
+
+def compare(baseline: dict, report: BenchmarkReport) -> List[tuple]:
+    """
+    Pairs the results of a report with those of a baseline JSON report.
+
+    Returns (label, baseline MB/s, current MB/s, ratio) for every case
+    present in both.
+    """
+    def key(result: dict) -> tuple:
+        return (result["engine"], result["direction"], result["size"],
+                result["jobs"])
+
+    previous = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in map(asdict, report.results):
+        old = previous.get(key(result))
+        if not old or not old["mb_per_s"] or result["error"]:
+            continue
+        label = (f"{result['engine']} {result['direction']} "
+                 f"{format_size(result['size'])}")
+        rows.append((label, old["mb_per_s"], result["mb_per_s"],
+                     result["mb_per_s"] / old["mb_per_s"]))
+    return rows
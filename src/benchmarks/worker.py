@@ -0,0 +1,52 @@
+"""
+Runs a single benchmark case in a fresh interpreter.
+
+Invoked by the runner as ``python -m benchmarks.worker CASE DIRECTION
+INPUT OUTPUT [ENGINE] [JOBS]``; prints the transform time as JSON so
+interpreter startup is not counted against library cases.
+"""
+import json
+import sys
+import time
+
+from amy.codec import Base64Decoder, Base64Encoder, CodecSession
+from amy.utils import ConfigNamespace
+
+
+def run_codec(direction: str, input_path: str, output_path: str) -> None:
+    """Transforms a whole file in memory with Codec.encode/decode."""
+    with open(input_path, 'rb') as file:
+        data = file.read()
+    codec = Base64Encoder if direction == "encode" else Base64Decoder
+    result = codec.encode(data) if direction == "encode" \
+        else codec.decode(data)
+    with open(output_path, 'wb') as file:
+        file.write(result)
+
+
+def run_session(direction: str, input_path: str, output_path: str,
+                engine: str, jobs: int) -> None:
+    """Transforms a file with a CodecSession using the given engine."""
+    session = CodecSession(ConfigNamespace(
+        mode=direction, file=input_path, output=output_path,
+        engine=engine, jobs=jobs))
+    session.process(encoding=direction == "encode")
+
+
+def main() -> None:
+    """Runs the case given on the command line."""
+    case, direction, input_path, output_path, *rest = sys.argv[1:]
+    started = time.perf_counter()
+
+    if case == "codec":
+        run_codec(direction, input_path, output_path)
+    else:
+        engine = rest[0] if rest else "stream"
+        jobs = int(rest[1]) if len(rest) > 1 else 1
+        run_session(direction, input_path, output_path, engine, jobs)
+
+    print(json.dumps({"seconds": time.perf_counter() - started}))
+
+
+if __name__ == "__main__":
+    main()
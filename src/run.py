@@ -1,9 +1,13 @@
 # pylint: disable=W0201
 import argparse
-from rich.prompt import Prompt
+import os
+import sys
 
-from amy.utils import Logger, ConfigNamespace
-from amy.codec import Base64FileEncoder, Base64FileDecoder
+from amy.utils import Logger, ConfigNamespace, MetricsWriter
+from amy.codec import (
+    Base64FileEncoder, Base64FileDecoder, codec_names, decode_range,
+    get_codec, verify)
+from amy.codec.batch import collect_files, run_batch
 
 
 def parse_arguments() -> ConfigNamespace:
@@ -28,16 +32,144 @@ def parse_arguments() -> ConfigNamespace:
         help="Decode a Base64 file"
     )
 
+    group.add_argument(
+        "--verify",
+        nargs=2,
+        metavar=("ORIGINAL", "ENCODED"),
+        help="Check that ENCODED decodes to ORIGINAL without writing "
+             "anything, '-' for an ENCODED on standard input"
+    )
+
     parser.add_argument(
         "--file", "-f",
         type=str,
-        help="Path to the file to be encoded or decoded"
+        nargs="+",
+        help="Paths, glob patterns or directories of the files to be "
+             "encoded or decoded, '-' for standard input"
     )
 
     parser.add_argument(
         "--output", "-o",
         type=str,
-        help="Path to save the output file (optional)"
+        help="Path to save the output file (optional), '-' for standard "
+             "output; the default when reading standard input"
+    )
+
+    parser.add_argument(
+        "--codec", "-c",
+        choices=codec_names(),
+        default="base64",
+        help="Binary-to-text encoding (default: base64); base85 and "
+             "ascii85 are the densest. Containers record it for decoding"
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Number of input bytes processed per step (default: 3 MiB)"
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=["stream", "pipeline", "mmap"],
+        default="stream",
+        help="I/O engine used for single-process runs (default: stream)"
+    )
+
+    parser.add_argument(
+        "--read-ahead",
+        type=int,
+        default=None,
+        help="Chunks queued between pipeline stages (default: 4)"
+    )
+
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes, 0 for all cores (default: 1)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time and throughput of every stage"
+    )
+
+    parser.add_argument(
+        "--container",
+        action="store_true",
+        help="Encode into a framed container with a size and SHA-256 "
+             "header and a CRC32 per frame; detected when decoding"
+    )
+
+    parser.add_argument(
+        "--compress",
+        choices=["zlib", "bz2", "lzma"],
+        default=None,
+        help="Compress every frame before encoding; implies --container, "
+             "detected when decoding"
+    )
+
+    parser.add_argument(
+        "--range",
+        type=str,
+        default=None,
+        metavar="OFFSET:LENGTH",
+        help="Decode only LENGTH bytes at OFFSET of the decoded data, "
+             "written to --output or standard output"
+    )
+
+    parser.add_argument(
+        "--no-index",
+        dest="range_index",
+        action="store_false",
+        help="With --range, compute the position in a file known to be a "
+             "single line instead of reading or building its sidecar index"
+    )
+
+    parser.add_argument(
+        "--incremental", "-i",
+        action="store_true",
+        help="Skip files whose output is up to date according to its "
+             "manifest, and write a manifest next to every output"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory of the file digest cache (default: ~/.cache/amy)"
+    )
+
+    parser.add_argument(
+        "--no-digest-cache",
+        dest="digest_cache",
+        action="store_false",
+        help="Always hash files instead of reusing cached digests"
+    )
+
+    parser.add_argument(
+        "--plain",
+        action="store_true",
+        help="Plain-text output without Rich, the default when not "
+             "attached to a terminal"
+    )
+
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Append one JSON line of metrics per file to PATH, "
+             "'-' for standard output, which moves the logs to stderr"
+    )
+
+    parser.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="Skip the summary tables; implied by '--metrics -'"
     )
 
     args = parser.parse_args()
@@ -45,26 +177,189 @@ def parse_arguments() -> ConfigNamespace:
     env = ConfigNamespace()
 
     env.mode = "encode" if args.encode else "decode"
-    env.file = args.file
+    env.verify = args.verify
+    env.files = args.file or []
+    env.file = None
     env.output = args.output
+    env.codec = args.codec
+    env.chunk_size = args.chunk_size
+    env.jobs = args.jobs
+    env.engine = args.engine
+    env.read_ahead = args.read_ahead
+    env.profile = args.profile
+    env.metrics = args.metrics
+    env.plain = args.plain
+    env.incremental = args.incremental
+    env.container = args.container
+    env.compression = args.compress
+    env.range = parse_range(parser, args.range) if args.range else None
+    env.range_index = args.range_index
+    # Encoded or decoded data on standard output moves the logs to stderr.
+    env.stdout = not args.verify and (
+        args.output == "-" or (args.file == ["-"] and not args.output))
+    if env.stdout and args.metrics == "-":
+        parser.error("--metrics - cannot share standard output with the "
+                     "data, use a file")
+    if args.incremental and "-" in (args.output, *(args.file or [])):
+        parser.error("--incremental needs files, not standard input or "
+                     "output")
+    env.cache_dir = args.cache_dir
+    env.digest_cache = args.digest_cache
+    # Logs would corrupt metrics or a range written to standard output.
+    env.quiet = args.quiet or args.metrics == "-" or \
+        bool(args.range and not args.output)
 
     return env
 
 
+def parse_range(parser: argparse.ArgumentParser, value: str) -> tuple:
+    """
+    Parse an OFFSET:LENGTH range.
+    """
+
+    try:
+        offset, length = (int(part) for part in value.split(":"))
+    except ValueError:
+        parser.error(f"--range expects OFFSET:LENGTH, got '{value}'")
+    if offset < 0 or length < 0:
+        parser.error("--range offset and length must not be negative")
+    return offset, length
+
+
+def extract_range(env: ConfigNamespace, display: Logger) -> bool:
+    """
+    Decode a range of a Base64 file without decoding all of it.
+    """
+
+    if env.mode != "decode" or not env.file:
+        display.error("--range needs --decode and a single input file")
+        return False
+
+    offset, length = env.range
+    try:
+        data = decode_range(env.file, offset, length,
+                            index=env.range_index,
+                            codec=get_codec(env.codec))
+    except ValueError as err:
+        display.error(f"Error: {err}")
+        return False
+
+    if env.output:
+        try:
+            with open(env.output, 'wb') as file:
+                file.write(data)
+        except OSError as err:
+            display.error(f"Error: Failed to write '{env.output}': {err}")
+            return False
+    else:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    return True
+
+
+def verify_files(env: ConfigNamespace, display: Logger) -> bool:
+    """
+    Verify an encoded file against its original, returning True on a match.
+    """
+
+    original, encoded = env.verify
+    if original == "-":
+        display.error("--verify reads only ENCODED from standard input")
+        return False
+
+    try:
+        result = verify(original, sys.stdin.buffer if encoded == "-"
+                        else encoded, codec=env.codec,
+                        chunk_size=env.chunk_size)
+    except ValueError as err:
+        display.error(f"Error: {err}")
+        return False
+
+    if env.metrics:
+        MetricsWriter(env.metrics).emit({"mode": "verify",
+                                         **result.to_dict()})
+    if env.quiet:
+        if not result.match:
+            display.error(f"'{result.encoded_path}' differs from "
+                          f"'{result.original_path}' at byte "
+                          f"{result.mismatch_offset}")
+        return result.match
+
+    display.log_verify(result)
+    return result.match
+
+
 def preprocess(env: ConfigNamespace) -> None:
     """
     Preprocess the environment variables.
     """
 
-    if not env.file:
+    if not env.files:
         print(
             "File path is required. "
             "Please provide a valid file path."
         )
-        env.file = Prompt.ask(
+        from rich.prompt import Prompt  # pylint: disable=import-outside-toplevel
+        env.files = [Prompt.ask(
             "[bold yellow] QUESTION\n[/bold yellow] "
             "Please enter the file path"
-        )
+        )]
+
+    if len(env.files) == 1 and (env.files[0] == "-" or
+                                os.path.isfile(env.files[0])):
+        env.file = env.files[0]
+
+
+def batch(env: ConfigNamespace, display: Logger) -> bool:
+    """
+    Encode or decode every file matched by the given paths, returning
+    True if all of them succeeded.
+    """
+
+    if env.output:
+        display.error("--output can only be used with a single input file")
+        return False
+
+    files = collect_files(env.files, mode=env.mode,
+                          suffix=get_codec(env.codec).suffix)
+    if not files:
+        display.error("No matching files found")
+        return False
+
+    report = run_batch(env, files)
+    if env.quiet:
+        for result in report.failed:
+            display.error(f"{result.input_path}: {result.error}")
+    else:
+        display.log_batch_summary(report)
+    return not report.failed
+
+
+def run(env: ConfigNamespace, display: Logger) -> bool:
+    """
+    Encode or decode as configured, returning True on success.
+    """
+
+    preprocess(env)
+
+    if env.range:
+        return extract_range(env, display)
+
+    if not env.file:
+        return batch(env, display)
+
+    codec = Base64FileEncoder() if env.mode == "encode" \
+        else Base64FileDecoder()
+    try:
+        codec.set_environment(env)
+    except (OSError, ValueError) as err:
+        display.error(f"Error: {err}")
+        return False
+    succeeded = codec.encode() if env.mode == "encode" else codec.decode()
+
+    if env.profile:
+        display.log_profile(codec.profiler)
+    return succeeded
 
 
 def main():
@@ -72,21 +367,26 @@ def main():
     Main function to run the Base64 encoding/decoding process.
     """
     display = Logger()
-    display.info(
-        "Starting Base64 File Encoder/Decoder CLI Tool",
-    )
     env = parse_arguments()
+    # Data or metrics on standard output move the logs to stderr.
+    if env.stdout or env.metrics == "-":
+        display.set_stream(sys.stderr)
+    if env.plain:
+        display.set_pretty(False)
+    if not env.quiet:
+        display.info(
+            "Starting Base64 File Encoder/Decoder CLI Tool",
+        )
 
-    preprocess(env)
+    if env.verify:
+        succeeded = verify_files(env, display)
+    else:
+        succeeded = run(env, display)
+
+    # Failures are logged; the status tells scripts and pipelines.
+    if not succeeded:
+        sys.exit(1)
 
-    if env.mode == "encode":
-        encoder = Base64FileEncoder()
-        encoder.set_environment(env)
-        encoder.encode()
-    if env.mode == "decode":
-        decoder = Base64FileDecoder()
-        decoder.set_environment(env)
-        decoder.decode()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,13 @@
+from amy.codec.batch import collect_files
+
+
+def test_glob_skips_outputs_and_sidecars(tmp_path):
+    for name in ["a.txt", "a.txt.b64", "a.txt.b64.amy.json",
+                 "a.txt.b64.amy.idx", "b.bin"]:
+        (tmp_path / name).write_bytes(b"x")
+    pattern = str(tmp_path / "*")
+
+    encoded = {path for path, _ in collect_files([pattern], mode="encode")}
+    decoded = {path for path, _ in collect_files([pattern], mode="decode")}
+    assert encoded == {str(tmp_path / "a.txt"), str(tmp_path / "b.bin")}
+    assert decoded == {str(tmp_path / "a.txt.b64")}
@@ -0,0 +1,52 @@
+import base64
+import binascii
+import io
+
+import pytest
+
+from amy.codec import open as codec_open
+from amy.codec.base.mapped import mmap_decode
+from amy.codec.base.parallel import parallel_decode
+from amy.codec.base.pipeline import pipeline_decode
+from amy.codec.base.stream import decode_stream
+
+# Padding in the middle of the input: a padded group ends the first line.
+EARLY_PADDING = base64.b64encode(b"x" * 3070) + b"\n" + \
+    base64.b64encode(b"hello")
+
+
+@pytest.mark.parametrize("chunk_size", [8, 4096, 8192, 3 * 1024 * 1024])
+def test_streaming_engines_reject_early_padding(tmp_path, chunk_size):
+    path = tmp_path / "input.b64"
+    path.write_bytes(EARLY_PADDING)
+    output = str(tmp_path / "output")
+
+    engines = [
+        lambda: decode_stream(io.BytesIO(EARLY_PADDING), io.BytesIO(),
+                              chunk_size=chunk_size),
+        lambda: pipeline_decode(io.BytesIO(EARLY_PADDING), io.BytesIO(),
+                                chunk_size=chunk_size),
+        lambda: mmap_decode(str(path), output, chunk_size=chunk_size),
+        lambda: codec_open(io.BytesIO(EARLY_PADDING), "decode",
+                           chunk_size=chunk_size).read(),
+    ]
+    for engine in engines:
+        with pytest.raises(binascii.Error):
+            engine()
+
+
+def test_parallel_decode_rejects_early_padding(tmp_path):
+    path = tmp_path / "input.b64"
+    path.write_bytes(EARLY_PADDING)
+    with pytest.raises(binascii.Error):
+        parallel_decode(str(path), str(tmp_path / "output"), jobs=2,
+                        chunk_size=8, segment_size=1024)
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 100, 3070])
+def test_final_padding_is_accepted(size):
+    data = bytes(range(256)) * 13
+    target = io.BytesIO()
+    decode_stream(io.BytesIO(base64.b64encode(data[:size]) + b"\n"), target,
+                  chunk_size=8)
+    assert target.getvalue() == data[:size]
@@ -0,0 +1,33 @@
+import hashlib
+import os
+
+from amy.utils import FileInfo
+from amy.utils.digest_cache import DigestCache
+
+
+def test_input_changed_during_transform_is_not_cached(tmp_path):
+    cache = DigestCache(str(tmp_path / "digests.sqlite"))
+    path = tmp_path / "input.bin"
+    path.write_bytes(b"before")
+    input_stat = os.stat(path)
+    streamed = hashlib.sha256(b"before").hexdigest()
+
+    # The input is rewritten while the transform streams the old content.
+    path.write_bytes(b"after, longer")
+    file = FileInfo(str(path), cache=cache)
+    file.record(6, 8, streamed, input_stat=input_stat)
+
+    assert cache.get(str(path)) is None
+    assert file.digest(str(path)) == \
+        hashlib.sha256(b"after, longer").hexdigest()
+
+
+def test_unchanged_input_is_cached(tmp_path):
+    cache = DigestCache(str(tmp_path / "digests.sqlite"))
+    path = tmp_path / "input.bin"
+    path.write_bytes(b"content")
+    digest = hashlib.sha256(b"content").hexdigest()
+
+    FileInfo(str(path), cache=cache).record(7, 12, digest,
+                                           input_stat=os.stat(path))
+    assert cache.get(str(path)) == digest
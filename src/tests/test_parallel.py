@@ -0,0 +1,19 @@
+import base64
+import os
+
+import pytest
+
+from amy.codec.base.parallel import parallel_decode
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("size", [1, 2, 3, 5000])
+def test_long_whitespace_tail(tmp_path, jobs, size):
+    data = os.urandom(size)
+    path = tmp_path / "input.b64"
+    path.write_bytes(base64.b64encode(data) + b"\n" * 300 + b" \r\n" * 2000)
+    output = tmp_path / "output"
+
+    parallel_decode(str(path), str(output), jobs=jobs, chunk_size=8,
+                    segment_size=1024)
+    assert output.read_bytes() == data
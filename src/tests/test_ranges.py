@@ -0,0 +1,30 @@
+import base64
+import os
+
+from amy.codec.base.ranges import decode_range
+
+
+def test_wrapping_after_the_first_line(tmp_path):
+    data = os.urandom(300000)
+    encoded = base64.b64encode(data)
+    # A long first line hides the wrapping from a look at the head.
+    lines = [encoded[:100000]] + [encoded[start:start + 76] for start in
+                                  range(100000, len(encoded), 76)]
+    path = tmp_path / "wrapped.b64"
+    path.write_bytes(b"\n".join(lines) + b"\n")
+
+    assert decode_range(str(path), 200000, 8) == data[200000:200008]
+    assert decode_range(str(path), 100000 // 4 * 3 - 3, 6) == \
+        data[100000 // 4 * 3 - 3:100000 // 4 * 3 + 3]
+
+
+def test_single_line_without_index(tmp_path):
+    data = os.urandom(1000)
+    path = tmp_path / "single.b64"
+    path.write_bytes(base64.b64encode(data) + b"\n")
+
+    for offset, length in [(0, 1), (1, 5), (997, 10), (1000, 4)]:
+        expected = data[offset:offset + length]
+        assert decode_range(str(path), offset, length) == expected
+        assert decode_range(str(path), offset, length,
+                            index=False) == expected
@@ -1,10 +1,14 @@
 import base64
+import binascii
 import os
 import hashlib
 from dataclasses import dataclass
 from rich.console import Console
 from rich.table import Table
 
+CHUNK_SIZE = 4 * 1024 * 1024
+WHITESPACE = b" \t\r\n\v\f"
+
 
 @dataclass
 class FileInfo:
@@ -59,6 +63,35 @@ class Base64Decoder:
         except base64.binascii.Error as err:
             raise ValueError(f"Failed to decode Base64 data: {err}") from err
 
+    @staticmethod
+    def decode_stream(source, target, chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Decodes Base64 content chunk by chunk, skipping line breaks.
+
+        Each slice is validated on its own, so padding that ends one slice
+        is carried over and any symbols after it are rejected.
+        """
+        pending = b""
+        padded = False
+        try:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                data = pending + chunk.translate(None, WHITESPACE)
+                if padded and data:
+                    raise binascii.Error(
+                        "Padding found before the end of the input")
+                cut = len(data) - (len(data) % 4)
+                pending = data[cut:]
+                if cut:
+                    padded = data[cut - 1:cut] == b"="
+                target.write(base64.b64decode(data[:cut], validate=True))
+            if pending:
+                target.write(base64.b64decode(pending, validate=True))
+        except binascii.Error as err:
+            raise ValueError(f"Failed to decode Base64 data: {err}") from err
+
     def __str__(self) -> str:
         return "Base64Decoder"
 
@@ -121,10 +154,10 @@ class Base64FileDecoder:
             original_file_path = self._get_original_file_path()
             original_file = FileInfo(original_file_path)
 
-            # Perform decoding
-            b64_data = self._read_file(b64_file.path)
-            original_data = Base64Decoder.decode(b64_data)
-            self._write_file(original_file.path, original_data)
+            # Perform decoding chunk by chunk
+            with open(b64_file.path, 'rb') as source, \
+                    open(original_file.path, 'wb') as target:
+                Base64Decoder.decode_stream(source, target)
 
             # Log success
             self.logger.log_summary(b64_file, original_file)
@@ -138,26 +171,6 @@ class Base64FileDecoder:
                 f"File '{self.b64_file_path}' does not have a valid '.b64' extension.")
         return self.b64_file_path[:-4]
 
-    @staticmethod
-    def _read_file(file_path: str) -> bytes:
-        """Reads content from the specified file."""
-        try:
-            with open(file_path, 'rb') as file:
-                return file.read()
-        except OSError as err:
-            raise ValueError(
-                f"Failed to read file '{file_path}': {err}") from err
-
-    @staticmethod
-    def _write_file(file_path: str, data: bytes) -> None:
-        """Writes data to the specified file."""
-        try:
-            with open(file_path, 'wb') as file:
-                file.write(data)
-        except OSError as err:
-            raise ValueError(
-                f"Failed to write to file '{file_path}': {err}") from err
-
 
 if __name__ == "__main__":
     # Replace 'plugin.VSIXPackage.b64' with the path to your Base64 file